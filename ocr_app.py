@@ -1,11 +1,20 @@
 import os
 import json
-import time
+import atexit
+import csv
+import bisect
+import collections
+import functools
+import hashlib
+import math
+import queue
+import shutil
+import tempfile
 import threading
 from datetime import datetime
 from tkinter import filedialog, messagebox
 import tkinter as tk
-from PIL import Image, ImageTk, ImageGrab
+from PIL import Image, ImageTk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 import re
@@ -19,9 +28,190 @@ except ImportError:
     DRAG_DROP_SUPPORTED = False
     print("警告: tkinterdnd2库未安装，拖放功能不可用。请使用pip install tkinterdnd2安装。")
 
+# 可选的OpenCV加速（未安装时使用Pillow，安装了Pillow-SIMD会自动生效）
+try:
+    import cv2
+    import numpy as np
+    CV2_SUPPORTED = True
+except ImportError:
+    CV2_SUPPORTED = False
+
+# 可选的orjson（未安装时使用标准库json）
+try:
+    import orjson
+    ORJSON_SUPPORTED = True
+except ImportError:
+    ORJSON_SUPPORTED = False
+
+# 可选的mss截屏（未安装时使用PIL.ImageGrab）
+try:
+    import mss
+    MSS_SUPPORTED = True
+except ImportError:
+    MSS_SUPPORTED = False
+
 from wechat_ocr.ocr_manager import OcrManager, OCR_MAX_TASK_ID
 
+# 批量OCR同时在途的任务数，可通过环境变量OCR_CONCURRENCY调整
+try:
+    OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", "0"))
+except ValueError:
+    OCR_CONCURRENCY = 0
+if OCR_CONCURRENCY <= 0:
+    OCR_CONCURRENCY = os.cpu_count() or 1
+OCR_CONCURRENCY = max(1, min(OCR_CONCURRENCY, OCR_MAX_TASK_ID))
+
+# OCR任务队列已满时的重试次数（退避间隔200ms起，每次翻倍）
+OCR_RETRY_ATTEMPTS = 3
+
+# 支持识别的图片扩展名
+IMAGE_EXTENSIONS = frozenset(('.png', '.jpg', '.jpeg', '.bmp', '.gif'))
+
+# PNG可直接保存的图片模式（含透明通道和调色板），无需先转换
+PNG_NATIVE_MODES = frozenset(('1', 'L', 'LA', 'P', 'RGB', 'RGBA', 'I', 'I;16'))
+
+# 批量窗口预览缩略图目录
+THUMBS_DIR = os.path.join("files", ".thumbs")
+
+# 送识别图片的最长边，超过时先缩小（识别引擎内部也会缩小，大图只会拖慢识别）
+OCR_MAX_SIDE = 2400
+
+# 程序退出时清理仍未删除的临时图片
+_TEMP_FILES = set()
+
+
+@atexit.register
+def _cleanup_temp_files():
+    for path in list(_TEMP_FILES):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _fast_copy(src, dst, move=False):
+    """把图片放入files目录：move=True时直接移动（仅用于程序自己生成的临时文件），
+    否则同一分区建立硬链接，不行才复制。用户的文件永远不会被移动"""
+    if move:
+        try:
+            os.replace(src, dst)
+            _TEMP_FILES.discard(src)
+            return
+        except OSError:
+            pass
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        # 跨分区或文件系统不支持硬链接
+        pass
+    # copyfile在Linux上走sendfile、Windows上走CopyFileEx，不额外复制权限和时间戳
+    shutil.copyfile(src, dst)
+
+
 # 兼容性支持
+def json_loads(data):
+    """解析JSON字节串"""
+    if ORJSON_SUPPORTED:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, pretty=False):
+    """序列化为UTF-8 JSON字节串，pretty=True时带缩进（仅调试用，体积大且慢）"""
+    if ORJSON_SUPPORTED:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def json_dumps_line(obj):
+    """序列化为单行UTF-8 JSON字节串（含换行符），用于JSONL追加"""
+    if ORJSON_SUPPORTED:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def write_file_atomic(path, data):
+    """先写临时文件再os.replace替换，中途崩溃也不会留下截断的文件"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def iter_images(folder_path):
+    """用os.scandir递归遍历文件夹，按扩展名产出图片路径（先当前目录的文件，再子目录）"""
+    pending = [folder_path]
+    while pending:
+        folder = pending.pop(0)
+        subdirs = []
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS and entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"无法读取文件夹: {folder}, 错误: {e}")
+            continue
+        # 与os.walk一样深度优先、按目录顺序进入子目录
+        pending[:0] = subdirs
+
+
+QUICK_HASH_SAMPLE = 64 * 1024
+
+
+def quick_hash(path):
+    """快速内容指纹：文件大小 + 开头和结尾各64KB的哈希，用于识别不同文件夹中的相同图片。
+    读取失败时返回None"""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return None
+    try:
+        size = os.fstat(fd).st_size
+        h = hashlib.blake2b(os.read(fd, QUICK_HASH_SAMPLE), digest_size=16)
+        if size > 2 * QUICK_HASH_SAMPLE:
+            os.lseek(fd, -QUICK_HASH_SAMPLE, os.SEEK_END)
+            h.update(os.read(fd, QUICK_HASH_SAMPLE))
+        elif size > QUICK_HASH_SAMPLE:
+            h.update(os.read(fd, QUICK_HASH_SAMPLE))
+        return size, h.digest()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+@functools.lru_cache(maxsize=4096)
+def _verify_image(path, mtime):
+    """用PIL校验图片文件是否完整可读，mtime参与缓存键，文件被替换后重新校验"""
+    try:
+        with Image.open(path) as image:
+            image.verify()
+        return True
+    except Exception:
+        return False
+
+
+def image_is_readable(path):
+    """检查图片能否被正常解码（结果按路径和修改时间缓存）"""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return False
+    return _verify_image(path, mtime)
+
+
 def make_window_draggable(window):
     """使窗口支持拖放功能"""
     if DRAG_DROP_SUPPORTED:
@@ -29,28 +219,113 @@ def make_window_draggable(window):
     return window
 
 
+# 拖放数据中的单个路径：{带空格的路径} 或 不含空白的路径
+_DND_TOKEN = re.compile(r"\{([^}]*)\}|(\S+)")
+
+
+@functools.lru_cache(maxsize=32)
 def parse_dnd_file_paths(data: str):
-    """解析tkinterdnd2的拖放数据为文件路径列表。
-    支持两种格式：
+    """解析tkinterdnd2的拖放数据为文件路径元组。
+    支持两种格式（可混合出现）：
     1) {C:/a/b.png} {C:/c/d.jpg}
     2) C:/a/b.png C:/c/d.jpg
-    同时去除可能的引号。
+    同时去除可能的引号。部分Tk版本悬停时会重复发送相同数据，因此缓存解析结果。
     """
     if not data:
-        return []
-    # 先匹配大括号包裹的多文件
-    matches = re.findall(r"\{([^}]*)\}", data)
-    if matches:
-        raw_paths = matches
-    else:
-        # 按空白分割（适配未加大括号、且路径不含空格的情况）
-        raw_paths = re.split(r"\s+", data.strip())
+        return ()
     paths = []
-    for p in raw_paths:
-        p = p.strip().strip('"').strip("'")
+    for match in _DND_TOKEN.finditer(data):
+        braced, bare = match.groups()
+        p = (braced if braced is not None else bare).strip().strip('"\'')
         if p:
             paths.append(p)
-    return paths
+    return tuple(paths)
+
+
+def open_display_image(image_path):
+    """打开并解码图片，统一转换为PhotoImage可直接使用的模式（L/RGB/RGBA），避免每次重绘时再转换"""
+    image = Image.open(image_path)
+    image.load()
+    if image.mode not in ('L', 'RGB', 'RGBA'):
+        has_alpha = 'A' in image.mode or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+    return image
+
+
+def fast_resize(image, size, resample=Image.Resampling.LANCZOS, box=None, reducing_gap=None):
+    """缩放图片，可用时使用OpenCV加速，否则退回Pillow。
+    参数与Image.resize一致，box为需要缩放的源图区域，reducing_gap仅对Pillow生效。
+    """
+    if CV2_SUPPORTED and image.mode in ('L', 'RGB', 'RGBA'):
+        if box is not None:
+            x1, y1, x2, y2 = box
+            image = image.crop((int(x1), int(y1), max(int(x1) + 1, round(x2)), max(int(y1) + 1, round(y2))))
+        if resample == Image.Resampling.BILINEAR:
+            interpolation = cv2.INTER_LINEAR
+        elif size[0] < image.width:
+            # 缩小时INTER_AREA效果最好，不会产生混叠
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_LANCZOS4
+        resized = cv2.resize(np.asarray(image), size, interpolation=interpolation)
+        return Image.fromarray(resized)
+    return image.resize(size, resample, box=box, reducing_gap=reducing_gap)
+
+
+def grab_screen(bbox):
+    """截取屏幕区域(x1, y1, x2, y2)，可用时使用mss，否则退回ImageGrab"""
+    if MSS_SUPPORTED:
+        x1, y1, x2, y2 = bbox
+        with mss.mss() as sct:
+            raw = sct.grab({'left': x1, 'top': y1, 'width': x2 - x1, 'height': y2 - y1})
+        # 直接按BGRX解码原始缓冲区，省去中间的RGB转换
+        return Image.frombytes('RGB', raw.size, raw.bgra, 'raw', 'BGRX')
+    # 截屏后端只在首次截屏时导入，不影响启动速度
+    from PIL import ImageGrab
+    # all_screens在Windows多显示器下按虚拟屏幕坐标截取，其它平台忽略该参数
+    return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+
+def _rotation_matrix(size, angle):
+    """计算与Image.rotate(-angle, expand=True)一致的仿射矩阵（输出坐标映射到原图坐标）及输出尺寸"""
+    w, h = size
+    rad = math.radians(angle)
+    a, b = round(math.cos(rad), 15), round(math.sin(rad), 15)
+    cx, cy = w / 2.0, h / 2.0
+    matrix = [a, b, cx - a * cx - b * cy, -b, a, cy + b * cx - a * cy]
+    
+    # 扩展画布以容纳旋转后的整张图片
+    xs, ys = [], []
+    for x, y in ((0, 0), (w, 0), (w, h), (0, h)):
+        xs.append(matrix[0] * x + matrix[1] * y + matrix[2])
+        ys.append(matrix[3] * x + matrix[4] * y + matrix[5])
+    new_w = math.ceil(max(xs)) - math.floor(min(xs))
+    new_h = math.ceil(max(ys)) - math.floor(min(ys))
+    tx, ty = -(new_w - w) / 2.0, -(new_h - h) / 2.0
+    matrix[2] += matrix[0] * tx + matrix[1] * ty
+    matrix[5] += matrix[3] * tx + matrix[4] * ty
+    return matrix, (new_w, new_h)
+
+
+def rotate_image(image, angle, box=None):
+    """顺时针旋转图片（扩展画布），box为旋转后图片中需要的区域。
+    指定box时直接从原图计算该区域，不需要先旋转整张图片再裁剪。
+    """
+    matrix, size = _rotation_matrix(image.size, angle)
+    if box is not None:
+        x1, y1, x2, y2 = box
+        matrix[2] += matrix[0] * x1 + matrix[1] * y1
+        matrix[5] += matrix[3] * x1 + matrix[4] * y1
+        size = (x2 - x1, y2 - y1)
+    
+    if CV2_SUPPORTED and image.mode in ('L', 'RGB', 'RGBA'):
+        # OpenCV以像素中心为坐标原点，需要修正半个像素的偏移
+        a, b, c, d, e, f = matrix
+        cv_matrix = np.array([[a, b, c + (a + b - 1) / 2], [d, e, f + (d + e - 1) / 2]])
+        rotated = cv2.warpAffine(np.asarray(image), cv_matrix, size,
+                                 flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP)
+        return Image.fromarray(rotated)
+    return image.transform(size, Image.Transform.AFFINE, matrix, Image.Resampling.BILINEAR)
 
 
 class ImageZoomWindow:
@@ -60,11 +335,26 @@ class ImageZoomWindow:
         self.parent_window = parent_window
         
         try:
-            self.original_image = Image.open(image_path)
+            self.original_image = open_display_image(image_path)
         except Exception as e:
             messagebox.showerror("错误", f"无法打开图片: {str(e)}")
             return
         
+        # 预先生成mipmap金字塔（每级尺寸减半），缩放时从最接近的层级取样，避免每次都处理原图全部像素
+        self.mipmaps = [self.original_image]
+        while min(self.mipmaps[-1].size) >= 128:
+            level_image = self.mipmaps[-1]
+            self.mipmaps.append(fast_resize(level_image, (level_image.width // 2, level_image.height // 2)))
+        
+        # 已渲染视口的LRU缓存，键为(缩放百分比, 视口位置和尺寸)
+        self._resize_cache = collections.OrderedDict()
+        self._hq_after_id = None
+        
+        # 重绘合并标记，连续的缩放/滚动只触发一次渲染
+        self._redraw_pending = False
+        self._redraw_hq = True
+        self._redraw_after_id = None
+        
         # 创建窗口
         self.root = tk.Toplevel()
         self.root.title(f"图片预览 - {os.path.basename(image_path)}")
@@ -83,17 +373,24 @@ class ImageZoomWindow:
         self.zoom_factor = 1.0
         self.pan_start_x = 0
         self.pan_start_y = 0
+        self.pan_view_x = 0
+        self.pan_view_y = 0
         self.is_panning = False
+        # 视口左上角在缩放后图像中的坐标，只渲染画布可见的部分
+        self.view_x = 0
+        self.view_y = 0
         self.photo = None  # 保存PhotoImage引用
         
         self.setup_ui()
         self.center_window()
         
         # 延迟显示图片，确保窗口完全初始化
-        self.root.after(100, self.display_image)
+        self._configure_after_id = self.root.after(100, self.display_image)
         
         # 绑定窗口大小变化事件
         self.root.bind('<Configure>', self.on_window_configure)
+        # 关闭窗口（包括标题栏关闭按钮）时取消尚未执行的重绘
+        self.root.bind('<Destroy>', self._on_destroy)
     
     def setup_ui(self):
         # 主框架
@@ -125,13 +422,11 @@ class ImageZoomWindow:
         # 创建画布和滚动条
         self.canvas = tk.Canvas(canvas_frame, bg='white', highlightthickness=0)
         
-        # 垂直滚动条
-        self.v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=self.v_scrollbar.set)
+        # 垂直滚动条（由视口位置驱动，不使用画布的scrollregion）
+        self.v_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.on_yscroll)
         
         # 水平滚动条
-        self.h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.canvas.xview)
-        self.canvas.configure(xscrollcommand=self.h_scrollbar.set)
+        self.h_scrollbar = ttk.Scrollbar(canvas_frame, orient=tk.HORIZONTAL, command=self.on_xscroll)
         
         # 使用grid布局确保滚动条正确显示
         self.canvas.grid(row=0, column=0, sticky='nsew')
@@ -164,15 +459,7 @@ class ImageZoomWindow:
             # 延迟更新，避免频繁刷新
             if hasattr(self, '_configure_after_id'):
                 self.root.after_cancel(self._configure_after_id)
-            self._configure_after_id = self.root.after(100, self.update_scrollbars)
-    
-    def update_scrollbars(self):
-        """更新滚动条"""
-        try:
-            # 更新滚动区域
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        except:
-            pass
+            self._configure_after_id = self.root.after(100, self.display_image)
     
     def center_window(self):
         """居中显示窗口"""
@@ -183,48 +470,180 @@ class ImageZoomWindow:
         y = (self.root.winfo_screenheight() // 2) - (height // 2)
         self.root.geometry(f'{width}x{height}+{x}+{y}')
     
-    def display_image(self):
-        """显示图片"""
+    def _canvas_size(self):
+        """获取画布尺寸"""
+        return max(self.canvas.winfo_width(), 1), max(self.canvas.winfo_height(), 1)
+    
+    def _clamp_view(self):
+        """限制视口不超出缩放后的图像范围"""
+        img_width, img_height = self.original_image.size
+        canvas_width, canvas_height = self._canvas_size()
+        max_x = max(0, int(img_width * self.zoom_factor) - canvas_width)
+        max_y = max(0, int(img_height * self.zoom_factor) - canvas_height)
+        self.view_x = int(min(max(self.view_x, 0), max_x))
+        self.view_y = int(min(max(self.view_y, 0), max_y))
+    
+    def display_image(self, high_quality=True):
+        """显示图片（只裁剪并缩放当前视口可见的区域）"""
         try:
             # 计算显示尺寸
             img_width, img_height = self.original_image.size
-            display_width = int(img_width * self.zoom_factor)
-            display_height = int(img_height * self.zoom_factor)
-            
-            # 缩放图片
-            if self.zoom_factor != 1.0:
-                display_image = self.original_image.resize(
-                    (display_width, display_height), 
-                    Image.Resampling.LANCZOS
-                )
+            display_width = max(1, int(img_width * self.zoom_factor))
+            display_height = max(1, int(img_height * self.zoom_factor))
+            
+            # 计算视口
+            canvas_width, canvas_height = self._canvas_size()
+            self._clamp_view()
+            view_x, view_y = self.view_x, self.view_y
+            out_width = max(1, min(canvas_width, display_width - view_x))
+            out_height = max(1, min(canvas_height, display_height - view_y))
+            
+            # 交互过程中使用BILINEAR，空闲后再用LANCZOS重绘
+            high_quality = high_quality and not self.is_panning
+            resample = Image.Resampling.LANCZOS if high_quality else Image.Resampling.BILINEAR
+            
+            # 缩放比例保留4位小数作为键：按百分比取整会让相差不到1%的适应窗口/滚轮缩放复用错误比例的画面
+            cache_key = (round(self.zoom_factor, 4), view_x, view_y, out_width, out_height)
+            photo = self._resize_cache.get(cache_key)
+            zoom_n = round(self.zoom_factor)
+            if photo is not None:
+                self._resize_cache.move_to_end(cache_key)
+            elif zoom_n >= 2 and abs(self.zoom_factor - zoom_n) < 1e-6:
+                photo = self._integer_zoom_photo(zoom_n, view_x, view_y, out_width, out_height)
+                self._resize_cache[cache_key] = photo
+                if len(self._resize_cache) > 8:
+                    self._resize_cache.popitem(last=False)
             else:
-                display_image = self.original_image.copy()
+                # 选择不小于目标尺寸的最小层级，剩余缩放不超过2倍
+                level = 0
+                if self.zoom_factor < 1.0:
+                    level = min(int(math.floor(-math.log2(self.zoom_factor))), len(self.mipmaps) - 1)
+                source = self.mipmaps[level]
+                
+                # 将视口映射回源图像坐标
+                scale = source.width / img_width / self.zoom_factor
+                box = (view_x * scale, view_y * scale,
+                       (view_x + out_width) * scale, (view_y + out_height) * scale)
+                
+                if self.zoom_factor == 1.0 and source is self.original_image:
+                    display_image = source.crop(tuple(int(v) for v in box))
+                else:
+                    display_image = fast_resize(source, (out_width, out_height), resample, box=box)
+                
+                # 转换为PhotoImage
+                photo = ImageTk.PhotoImage(display_image)
+                # 只缓存高质量的结果
+                if high_quality:
+                    self._resize_cache[cache_key] = photo
+                    if len(self._resize_cache) > 8:
+                        self._resize_cache.popitem(last=False)
             
-            # 转换为PhotoImage
-            self.photo = ImageTk.PhotoImage(display_image)
+            self.photo = photo
             
             # 清空画布并显示图片
             self.canvas.delete("all")
             self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
             
-            # 更新滚动区域
-            self.canvas.configure(scrollregion=(0, 0, display_width, display_height))
+            # 更新滚动条
+            self.h_scrollbar.set(view_x / display_width, (view_x + out_width) / display_width)
+            self.v_scrollbar.set(view_y / display_height, (view_y + out_height) / display_height)
             
             # 更新缩放比例显示
             self.zoom_label.config(text=f"{int(self.zoom_factor * 100)}%")
             
         except Exception as e:
             messagebox.showerror("错误", f"显示图片失败: {str(e)}")
+
+    def _integer_zoom_photo(self, n, view_x, view_y, out_width, out_height):
+        """整数倍放大：只裁剪视口对应的原图区域，由Tk原生zoom做最近邻放大"""
+        img_width, img_height = self.original_image.size
+        left, top = view_x // n, view_y // n
+        right = min(img_width, -(-(view_x + out_width) // n))
+        bottom = min(img_height, -(-(view_y + out_height) // n))
+        base = ImageTk.PhotoImage(self.original_image.crop((left, top, right, bottom)))
+
+        zoomed = tk.PhotoImage(master=self.canvas)
+        zoomed.tk.call(zoomed, 'copy', base, '-zoom', n, n)
+
+        # 视口起点不一定落在整像素边界上，再截取可见部分
+        off_x, off_y = view_x - left * n, view_y - top * n
+        photo = tk.PhotoImage(master=self.canvas, width=out_width, height=out_height)
+        photo.tk.call(photo, 'copy', zoomed, '-from', off_x, off_y, off_x + out_width, off_y + out_height)
+        return photo
+
+    def _schedule_redraw(self, high_quality=True):
+        """合并短时间内的多次重绘请求"""
+        if self._redraw_pending:
+            self._redraw_hq = self._redraw_hq and high_quality
+            return
+        self._redraw_pending = True
+        self._redraw_hq = high_quality
+        self._redraw_after_id = self.root.after(30, self._do_redraw)
+    
+    def _do_redraw(self):
+        self._redraw_pending = False
+        self._redraw_after_id = None
+        self.display_image(high_quality=self._redraw_hq)
+    
+    def _schedule_hq_redraw(self):
+        """交互结束150ms后用LANCZOS重绘"""
+        if self._hq_after_id:
+            self.root.after_cancel(self._hq_after_id)
+        self._hq_after_id = self.root.after(150, self._hq_redraw)
+    
+    def _hq_redraw(self):
+        self._hq_after_id = None
+        self.display_image()
+    
+    def on_xscroll(self, *args):
+        """水平滚动条回调"""
+        self._scroll_view('x', *args)
+    
+    def on_yscroll(self, *args):
+        """垂直滚动条回调"""
+        self._scroll_view('y', *args)
+    
+    def _scroll_view(self, axis, action, value, unit=None):
+        """根据滚动条操作移动视口"""
+        canvas_width, canvas_height = self._canvas_size()
+        if axis == 'x':
+            total = self.original_image.width * self.zoom_factor
+            page, pos = canvas_width, self.view_x
+        else:
+            total = self.original_image.height * self.zoom_factor
+            page, pos = canvas_height, self.view_y
+        
+        if action == 'moveto':
+            pos = float(value) * total
+        elif action == 'scroll':
+            step = page * 0.9 if unit == 'pages' else 20
+            pos += int(value) * step
+        
+        if axis == 'x':
+            self.view_x = pos
+        else:
+            self.view_y = pos
+        self._schedule_redraw(high_quality=False)
+        self._schedule_hq_redraw()
+    
+    def _set_zoom(self, zoom_factor):
+        """设置缩放比例，并保持视口中心不变"""
+        canvas_width, canvas_height = self._canvas_size()
+        center_x = (self.view_x + canvas_width / 2) / self.zoom_factor
+        center_y = (self.view_y + canvas_height / 2) / self.zoom_factor
+        self.zoom_factor = zoom_factor
+        self.view_x = center_x * zoom_factor - canvas_width / 2
+        self.view_y = center_y * zoom_factor - canvas_height / 2
     
     def zoom_in(self):
         """放大"""
-        self.zoom_factor = min(self.zoom_factor * 1.25, 5.0)  # 最大5倍
-        self.display_image()
+        self._set_zoom(min(self.zoom_factor * 1.25, 5.0))  # 最大5倍
+        self._schedule_redraw()
     
     def zoom_out(self):
         """缩小"""
-        self.zoom_factor = max(self.zoom_factor / 1.25, 0.1)  # 最小0.1倍
-        self.display_image()
+        self._set_zoom(max(self.zoom_factor / 1.25, 0.1))  # 最小0.1倍
+        self._schedule_redraw()
     
     def fit_to_window(self):
         """适应窗口大小"""
@@ -237,43 +656,45 @@ class ImageZoomWindow:
             width_ratio = canvas_width / img_width
             height_ratio = canvas_height / img_height
             self.zoom_factor = min(width_ratio, height_ratio, 1.0)  # 不放大
-            self.display_image()
+            self.view_x = self.view_y = 0
+            self._schedule_redraw()
     
     def actual_size(self):
         """原始大小"""
-        self.zoom_factor = 1.0
-        self.display_image()
+        self._set_zoom(1.0)
+        self._schedule_redraw()
     
     def start_pan(self, event):
         """开始拖拽"""
-        self.canvas.scan_mark(event.x, event.y)
+        self.pan_start_x, self.pan_start_y = event.x, event.y
+        self.pan_view_x, self.pan_view_y = self.view_x, self.view_y
         self.is_panning = True
         self.canvas.config(cursor="fleur")
     
     def pan_image(self, event):
         """拖拽图片"""
         if self.is_panning:
-            # 使用canvas的scan功能进行平滑拖拽
-            self.canvas.scan_dragto(event.x, event.y, gain=1)
+            # 根据按下时记录的视口位置和鼠标位移计算新视口，合并为每帧最多一次渲染
+            self.view_x = self.pan_view_x - (event.x - self.pan_start_x)
+            self.view_y = self.pan_view_y - (event.y - self.pan_start_y)
+            self._schedule_redraw(high_quality=False)
     
     def end_pan(self, event):
         """结束拖拽"""
         self.is_panning = False
         self.canvas.config(cursor="")
+        self._schedule_hq_redraw()
     
     def mouse_wheel(self, event):
         """鼠标滚轮缩放"""
-        # Windows和macOS
-        if hasattr(event, 'delta'):
-            if event.delta > 0:
-                self.zoom_in()
-            else:
-                self.zoom_out()
-        # Linux
-        elif event.num == 4:
-            self.zoom_in()
-        elif event.num == 5:
-            self.zoom_out()
+        # Linux为Button-4/5，Windows和macOS根据delta判断方向
+        if event.num == 4 or (event.num != 5 and getattr(event, 'delta', 0) > 0):
+            self._set_zoom(min(self.zoom_factor * 1.25, 5.0))
+        else:
+            self._set_zoom(max(self.zoom_factor / 1.25, 0.1))
+        # 滚轮连续滚动时只累积缩放比例，合并为一次快速预览，停止后再高质量重绘
+        self._schedule_redraw(high_quality=False)
+        self._schedule_hq_redraw()
     
     def key_press(self, event):
         """键盘快捷键"""
@@ -288,6 +709,14 @@ class ImageZoomWindow:
         elif event.keysym == 'Escape':
             self.close_window()
     
+    def _on_destroy(self, event):
+        """窗口销毁时取消待执行的重绘，避免在已销毁的画布上绘制"""
+        if event.widget is self.root:
+            for after_id in (self._redraw_after_id, self._hq_after_id, self._configure_after_id):
+                if after_id:
+                    self.root.after_cancel(after_id)
+            self._redraw_after_id = self._hq_after_id = self._configure_after_id = None
+    
     def close_window(self):
         """关闭窗口"""
         self.root.destroy()
@@ -302,6 +731,13 @@ class ImageRotationWindow:
         self.current_rotation = 0
         self.selection_box = None  # 单个框选区域
         self.current_box = None
+        
+        # 画布上常驻的图元ID，重绘时只更新坐标/图片，不反复删除重建
+        self._img_item = None
+        self._grid_h_item = None
+        self._grid_v_item = None
+        self._sel_rect_item = None
+        self._sel_text_item = None
         self.start_x = None
         self.start_y = None
         
@@ -310,6 +746,22 @@ class ImageRotationWindow:
         self.resize_edge = None  # 可以是 'n', 's', 'e', 'w', 'ne', 'nw', 'se', 'sw'
         self.resize_box = None
         
+        # 交互状态：交互过程中用BILINEAR快速显示，结束后再用LANCZOS重绘
+        self._interactive = False
+        self._interactive_after_id = None
+        self._displayed_low_quality = False
+        
+        # 旋转结果缓存(角度, 图片)和显示结果缓存(角度, PhotoImage, 缩放比例, 是否低质量)
+        self._rotated_cache = (None, None)
+        self._display_cache = None
+        
+        # 后台旋转线程，避免大图旋转时阻塞界面；token递增，只采用最新一次请求的结果
+        self._work_q = queue.Queue()
+        self._results = queue.Queue()
+        self._rotate_token = 0
+        self._pending_rotation = None
+        threading.Thread(target=self._rotate_worker, daemon=True).start()
+        
         # 创建窗口
         self.root = tk.Toplevel()
         self.root.title("图片旋转和框选")
@@ -327,6 +779,8 @@ class ImageRotationWindow:
             pass
         
         self.setup_ui()
+        self._drain_after_id = self.root.after(30, self._drain_results)
+        self.root.bind('<Destroy>', self._on_destroy)
         # 如果初始有图片则加载
         if self.image_path:
             self.load_image(self.image_path)
@@ -438,7 +892,12 @@ class ImageRotationWindow:
     def load_image(self, image_path):
         try:
             self.image_path = image_path
-            self.original_image = Image.open(image_path)
+            # 立即解码并统一模式，避免后台线程与主线程同时触发延迟加载
+            self.original_image = open_display_image(image_path)
+            self._rotated_cache = (None, None)
+            self._display_cache = None
+            self._rotate_token += 1
+            self._pending_rotation = None
             self.current_rotation = 0
             self.selection_box = None
             self.angle_var.set("0")
@@ -453,6 +912,7 @@ class ImageRotationWindow:
             if self.original_image is None:
                 # 无图时显示提示
                 self.canvas.delete("all")
+                self._img_item = None
                 self.canvas.create_text(
                     400, 250,
                     text="请点击'打开图片'或拖放图片到此处",
@@ -461,39 +921,55 @@ class ImageRotationWindow:
                 self.canvas.configure(scrollregion=self.canvas.bbox("all"))
                 return
             
-            # 应用旋转
-            if self.current_rotation != 0:
-                rotated_image = self.original_image.rotate(-self.current_rotation, expand=True)
+            # 角度和质量都没变时直接复用上次的显示结果，跳过旋转和缩放
+            cached = self._display_cache
+            if cached and cached[0] == self.current_rotation and (self._interactive or not cached[3]):
+                _, self.photo, self.scale_factor, self._displayed_low_quality = cached
             else:
-                rotated_image = self.original_image.copy()
-            
-            # 计算显示尺寸（限制最大尺寸）
-            max_width, max_height = 800, 500
-            img_width, img_height = rotated_image.size
-            
-            if img_width > max_width or img_height > max_height:
-                ratio = min(max_width / img_width, max_height / img_height)
-                new_width = int(img_width * ratio)
-                new_height = int(img_height * ratio)
-                display_image = rotated_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                self.scale_factor = ratio
-            else:
-                display_image = rotated_image
-                self.scale_factor = 1.0
+                # 应用旋转（按角度缓存，非零角度交给后台线程，完成后再刷新显示）
+                if self._rotated_cache[0] != self.current_rotation:
+                    if self.current_rotation != 0:
+                        self._request_rotation()
+                        return
+                    # 0度时直接引用原图，PhotoImage只读取像素，无需复制
+                    self._rotated_cache = (0, self.original_image)
+                rotated_image = self._rotated_cache[1]
+                
+                # 计算显示尺寸（限制最大尺寸）
+                max_width, max_height = 800, 500
+                img_width, img_height = rotated_image.size
+                
+                if img_width > max_width or img_height > max_height:
+                    ratio = min(max_width / img_width, max_height / img_height)
+                    new_width = int(img_width * ratio)
+                    new_height = int(img_height * ratio)
+                    resample = Image.Resampling.BILINEAR if self._interactive else Image.Resampling.LANCZOS
+                    # 大幅缩小时先用盒式滤波整数倍缩减，再做LANCZOS，减少滤波计算量
+                    display_image = fast_resize(rotated_image, (new_width, new_height), resample, reducing_gap=3.0)
+                    # 按实际输出尺寸计算比例，避免取整误差导致框选坐标偏移
+                    self.scale_factor = display_image.width / img_width
+                    self._displayed_low_quality = self._interactive
+                else:
+                    display_image = rotated_image
+                    self.scale_factor = 1.0
+                    self._displayed_low_quality = False
+                
+                # 转换为PhotoImage
+                self.photo = ImageTk.PhotoImage(display_image)
+                self._display_cache = (self.current_rotation, self.photo, self.scale_factor, self._displayed_low_quality)
             
-            # 转换为PhotoImage并显示
-            self.photo = ImageTk.PhotoImage(display_image)
-            self.canvas.delete("all")
-            self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+            # 显示图片
+            self._ensure_canvas_items()
+            self.canvas.itemconfig(self._img_item, image=self.photo)
             
-            # 更新画布滚动区域
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            # 更新十字坐标
+            display_width = self.photo.width()
+            display_height = self.photo.height()
+            self.canvas.coords(self._grid_h_item, 0, display_height/2, display_width, display_height/2)
+            self.canvas.coords(self._grid_v_item, display_width/2, 0, display_width/2, display_height)
             
-            # 绘制十字坐标
-            display_width = display_image.width
-            display_height = display_image.height
-            self.canvas.create_line(0, display_height/2, display_width, display_height/2, fill="red", dash=(4, 4), width=1, tags="grid")
-            self.canvas.create_line(display_width/2, 0, display_width/2, display_height, fill="red", dash=(4, 4), width=1, tags="grid")
+            # 更新画布滚动区域（按图片尺寸，不受框选标签影响）
+            self.canvas.configure(scrollregion=(0, 0, display_width, display_height))
             
             # 重新绘制框选
             self.redraw_selections()
@@ -501,6 +977,84 @@ class ImageRotationWindow:
         except Exception as e:
             messagebox.showerror("错误", f"图片显示失败: {str(e)}")
 
+    def _ensure_canvas_items(self):
+        """首次显示（或画布被清空）时按层级创建图片、十字线和框选图元"""
+        if self._img_item is not None:
+            return
+        self.canvas.delete("all")
+        self._img_item = self.canvas.create_image(0, 0, anchor=tk.NW)
+        self._grid_h_item = self.canvas.create_line(0, 0, 0, 0, fill="red", dash=(4, 4), width=1, tags="grid")
+        self._grid_v_item = self.canvas.create_line(0, 0, 0, 0, fill="red", dash=(4, 4), width=1, tags="grid")
+        self._sel_rect_item = self.canvas.create_rectangle(
+            0, 0, 0, 0, outline='red', width=2, tags='selection', state='hidden'
+        )
+        self._sel_text_item = self.canvas.create_text(
+            0, 0, text='1', fill='red', font=('Arial', 12, 'bold'), tags='selection', state='hidden'
+        )
+    
+    def _request_rotation(self):
+        """将当前角度的旋转任务提交给后台线程"""
+        if self._pending_rotation == self.current_rotation:
+            return
+        self._pending_rotation = self.current_rotation
+        self._rotate_token += 1
+        self._work_q.put((self.original_image, self.current_rotation, self._rotate_token))
+    
+    def _rotate_worker(self):
+        """后台旋转线程"""
+        while True:
+            image, angle, token = self._work_q.get()
+            if image is None:
+                break
+            # 已有更新的请求时跳过过期任务
+            if token != self._rotate_token:
+                continue
+            try:
+                self._results.put((token, angle, image.rotate(-angle, expand=True)))
+            except Exception as e:
+                print(f"旋转图片失败: {e}")
+    
+    def _drain_results(self):
+        """在主线程中取出旋转结果，丢弃过期的结果"""
+        latest = None
+        while True:
+            try:
+                token, angle, rotated_image = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if token == self._rotate_token and angle == self.current_rotation:
+                latest = (angle, rotated_image)
+        if latest:
+            self._pending_rotation = None
+            self._rotated_cache = latest
+            self.display_image()
+        self._drain_after_id = self.root.after(30, self._drain_results)
+    
+    def _on_destroy(self, event):
+        """窗口销毁时停止后台线程"""
+        if event.widget is self.root:
+            self.root.after_cancel(self._drain_after_id)
+            if self._interactive_after_id:
+                self.root.after_cancel(self._interactive_after_id)
+                self._interactive_after_id = None
+            self._work_q.put((None, None, None))
+    
+    def _begin_interaction(self):
+        """标记进入交互状态，200ms内没有新的操作则视为结束"""
+        self._interactive = True
+        if self._interactive_after_id:
+            self.root.after_cancel(self._interactive_after_id)
+        self._interactive_after_id = self.root.after(200, self._end_interaction)
+    
+    def _end_interaction(self):
+        """结束交互状态，如果当前显示的是低质量图片则用LANCZOS重绘一次"""
+        if self._interactive_after_id:
+            self.root.after_cancel(self._interactive_after_id)
+            self._interactive_after_id = None
+        self._interactive = False
+        if self._displayed_low_quality:
+            self.display_image()
+    
     # 旋转/框选等操作增加防护
     def _ensure_image(self):
         if self.original_image is None:
@@ -525,6 +1079,7 @@ class ImageRotationWindow:
     def rotate_minus_one(self):
         if not self._ensure_image():
             return
+        self._begin_interaction()
         self.current_rotation = (self.current_rotation - 1) % 360
         self.selection_box = None
         self.display_image()
@@ -533,6 +1088,7 @@ class ImageRotationWindow:
     def rotate_plus_one(self):
         if not self._ensure_image():
             return
+        self._begin_interaction()
         self.current_rotation = (self.current_rotation + 1) % 360
         self.selection_box = None
         self.display_image()
@@ -572,22 +1128,19 @@ class ImageRotationWindow:
                 self.resize_edge = edge
                 return
         
-        # 如果已有框选并且不是在调整大小，则删除旧的框选
-        if self.selection_box and not self.is_resizing:
-            self.canvas.delete(self.selection_box['canvas_id'])
-            if 'text_id' in self.selection_box:
-                self.canvas.delete(self.selection_box['text_id'])
-        
-        # 创建新的框选矩形
+        # 不是在调整大小时，复用框选矩形开始新的框选，并隐藏旧的序号标签
         if not self.is_resizing:
-            self.current_box = self.canvas.create_rectangle(
-                self.start_x, self.start_y, self.start_x, self.start_y,
-                outline='red', width=2, tags='selection'
-            )
+            self._ensure_canvas_items()
+            self.selection_box = None
+            self.canvas.itemconfig(self._sel_text_item, state='hidden')
+            self.current_box = self._sel_rect_item
+            self.canvas.coords(self.current_box, self.start_x, self.start_y, self.start_x, self.start_y)
+            self.canvas.itemconfig(self.current_box, state='normal')
     
     def update_selection(self, event):
         if not self._ensure_image():
             return
+        self._interactive = True
         current_x = self.canvas.canvasx(event.x)
         current_y = self.canvas.canvasy(event.y)
         
@@ -636,15 +1189,16 @@ class ImageRotationWindow:
                 }
                 label_x = (self.start_x + current_x) / 2
                 label_y = min(self.start_y, current_y) - 10
-                text_id = self.canvas.create_text(
-                    label_x, label_y, text='1',
-                    fill='red', font=('Arial', 12, 'bold'), tags='selection'
-                )
-                self.selection_box['text_id'] = text_id
+                self.canvas.coords(self._sel_text_item, label_x, label_y)
+                self.canvas.itemconfig(self._sel_text_item, state='normal')
+                self.selection_box['text_id'] = self._sel_text_item
             else:
-                self.canvas.delete(self.current_box)
+                self.canvas.itemconfig(self.current_box, state='hidden')
                 self.selection_box = None
             self.current_box = None
+        
+        # 框选完成后再结束交互状态，避免重绘时删除正在绘制的框
+        self._end_interaction()
 
     def confirm_and_ocr(self):
         """确认并执行OCR"""
@@ -652,22 +1206,26 @@ class ImageRotationWindow:
             messagebox.showwarning("提示", "请先打开图片")
             return
         try:
-            # 应用旋转并保存
-            if self.current_rotation != 0:
-                rotated_image = self.original_image.rotate(-self.current_rotation, expand=True)
+            # 有框选时只计算框选区域，不旋转整张图片
+            box = self.selection_box['box'] if self.selection_box else None
+            if box is not None or self.current_rotation != 0:
+                rotated_image = rotate_image(self.original_image, self.current_rotation, box)
             else:
-                rotated_image = self.original_image.copy()
+                rotated_image = self.original_image
             
-            # 保存旋转后的图片
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            temp_path = f"temp_rotated_{timestamp}.png"
-            rotated_image.save(temp_path)
+            # 保存为BMP临时文件（无压缩，省去PNG编码和OCR端解码的开销）
+            if rotated_image.mode not in ('1', 'L', 'P', 'RGB', 'RGBA'):
+                rotated_image = rotated_image.convert('RGBA' if 'A' in rotated_image.mode else 'RGB')
+            fd, temp_path = tempfile.mkstemp(prefix="temp_rotated_", suffix=".bmp", dir=".")
+            os.close(fd)
+            _TEMP_FILES.add(temp_path)
+            rotated_image.save(temp_path, 'BMP')
             
-            # 传递框选信息
+            # 框选区域已经裁剪好，直接识别整张临时图片
             result_data = {
                 'image_path': temp_path,
                 'rotation': self.current_rotation,
-                'selections': [self.selection_box['box']] if self.selection_box else None
+                'selections': None
             }
             
             if self.callback:
@@ -706,33 +1264,32 @@ class ImageRotationWindow:
         return edge
     
     def redraw_selections(self):
-        """重新绘制框选区域"""
-        self.canvas.delete('selection')
-        if self.selection_box:
-            box = self.selection_box['box']
-            # 应用缩放
-            x1, y1, x2, y2 = [coord * self.scale_factor for coord in box]
-            
-            # 重新创建矩形
-            rect_id = self.canvas.create_rectangle(
-                x1, y1, x2, y2, outline='red', width=2, tags='selection'
-            )
-            
-            # 重新创建序号标签
-            label_x = (x1 + x2) / 2
-            label_y = y1 - 10
-            text_id = self.canvas.create_text(
-                label_x, label_y, text='1',
-                fill='red', font=('Arial', 12, 'bold'), tags='selection'
-            )
-            
-            self.selection_box['canvas_id'] = rect_id
-            self.selection_box['text_id'] = text_id
+        """重新绘制框选区域（移动已有图元）"""
+        if self._sel_rect_item is None:
+            return
+        if not self.selection_box:
+            self.canvas.itemconfig(self._sel_text_item, state='hidden')
+            # 正在拖动新框选时保留矩形
+            if self.current_box is None:
+                self.canvas.itemconfig(self._sel_rect_item, state='hidden')
+            return
+        box = self.selection_box['box']
+        # 应用缩放
+        x1, y1, x2, y2 = [coord * self.scale_factor for coord in box]
+        
+        # 移动矩形和序号标签
+        self.canvas.coords(self._sel_rect_item, x1, y1, x2, y2)
+        self.canvas.coords(self._sel_text_item, (x1 + x2) / 2, y1 - 10)
+        self.canvas.itemconfig('selection', state='normal')
+        
+        self.selection_box['canvas_id'] = self._sel_rect_item
+        self.selection_box['text_id'] = self._sel_text_item
     
     def clear_selections(self):
         """清除框选"""
         self.selection_box = None
-        self.canvas.delete('selection')
+        if self._sel_rect_item is not None:
+            self.canvas.itemconfig('selection', state='hidden')
 
     def center_window(self):
         """居中显示窗口"""
@@ -796,17 +1353,7 @@ class ScreenshotWindow:
         """直接截取全屏"""
         screen_width = self.root.winfo_screenwidth()
         screen_height = self.root.winfo_screenheight()
-        
-        self.root.destroy()
-        
-        try:
-            # 将窗口隐藏后再截屏，避免截取到窗口本身
-            time.sleep(0.1)  # 给窗口时间隐藏
-            screenshot = ImageGrab.grab(bbox=(0, 0, screen_width, screen_height))
-            self.callback(screenshot)
-        except Exception as e:
-            messagebox.showerror("错误", f"全屏截图失败: {str(e)}")
-            print(f"全屏截图错误: {e}")
+        self._hide_and_grab((0, 0, screen_width, screen_height), "全屏截图")
     
     def end_select(self, event):
         if self.start_x is not None and self.start_y is not None:
@@ -830,27 +1377,53 @@ class ScreenshotWindow:
                 x1, y1 = 0, 0
                 x2, y2 = screen_width, screen_height
             
-            # 先隐藏窗口以避免截取到窗口本身
-            self.root.withdraw()
-            self.root.update_idletasks()  # 确保窗口状态更新
-            time.sleep(0.1)  # 给窗口时间隐藏
-            
-            try:
-                # 截屏
-                screenshot = ImageGrab.grab(bbox=(x1, y1, x2, y2))
-                self.root.destroy()  # 确保在回调前销毁窗口
-                self.callback(screenshot)
-            except Exception as e:
-                self.root.destroy()
-                messagebox.showerror("错误", f"截图失败: {str(e)}")
-                print(f"截图错误: {e}")
+            self._hide_and_grab((x1, y1, x2, y2), "截图")
         else:
             self.root.destroy()
     
+    def _hide_and_grab(self, bbox, action):
+        """先隐藏窗口，等待一帧后再截屏，避免截取到窗口本身且不阻塞界面"""
+        self.root.withdraw()
+        self.root.update_idletasks()  # 确保窗口状态更新
+        self.root.after(16, lambda: self._do_grab(bbox, action))
+    
+    def _do_grab(self, bbox, action):
+        try:
+            screenshot = grab_screen(bbox)
+            self.root.destroy()  # 确保在回调前销毁窗口
+            self.callback(screenshot)
+        except Exception as e:
+            self.root.destroy()
+            messagebox.showerror("错误", f"{action}失败: {str(e)}")
+            print(f"{action}错误: {e}")
+    
     def cancel(self):
         self.root.destroy()
 
 
+def _history_cache(item):
+    """在记录上缓存列表预览和小写文本（下划线开头的字段不会写入历史文件）"""
+    if '_preview' not in item:
+        text = item['text']
+        item['_preview'] = (text[:50] + "..." if len(text) > 50 else text).replace('\n', ' ')
+        item['_text_lower'] = text.lower()
+    return item
+
+
+@functools.lru_cache(maxsize=128)
+def _thumb(path, mtime, max_width, max_height):
+    """生成缩略图，mtime参与缓存键，文件被替换后自动失效。
+    缓存的是PIL图片而不是PhotoImage，调用方不能修改返回的图片。
+    """
+    with Image.open(path) as image:
+        # JPEG在解码时直接降采样，避免按原始分辨率完整解码
+        image.draft('RGB', (max_width * 2, max_height * 2))
+        image.thumbnail((max_width, max_height), Image.Resampling.BILINEAR)
+        # 图片本来就小于目标尺寸时thumbnail不会解码像素，关闭文件前必须先载入
+        image.load()
+        return image
+
+
 class HistoryWindow:
     """历史记录弹窗"""
     def __init__(self, parent, history, callback):
@@ -858,6 +1431,19 @@ class HistoryWindow:
         self.history = history
         self.callback = callback
         
+        # 虚拟列表：先插入空的占位行，滚动到可见区域时再填充内容
+        self._row_cache = []     # 行位置 -> (iid, 历史记录索引)
+        self._rendered = set()   # 已填充内容的行位置
+        self._iid_to_index = {}  # iid -> 历史记录索引，选择时直接查表
+        self._detail_current_index = None  # 详情面板当前显示的记录索引
+        
+        # 搜索防抖和小写搜索索引[(小写文本, 小写时间, 索引)]，历史记录变化时置为None重建
+        self._search_after_id = None
+        self._search_index = None
+        
+        # files目录下已有图片路径的缓存（一次scandir代替逐条stat）
+        self._files_dir_cache = None
+        
         # 创建弹窗
         self.window = ttk.Toplevel(parent.root)
         self.window.title("OCR历史记录")
@@ -907,13 +1493,15 @@ class HistoryWindow:
         self.history_tree.heading('时间', text='时间')
         self.history_tree.heading('预览', text='文本预览')
         
-        self.history_tree.column('#0', width=50, minwidth=50)
-        self.history_tree.column('时间', width=150, minwidth=150)
-        self.history_tree.column('预览', width=300, minwidth=200)
+        # 固定序号和时间列宽度，只让预览列伸缩，插入行时不必重新分配列宽
+        self.history_tree.column('#0', width=50, minwidth=50, stretch=False)
+        self.history_tree.column('时间', width=150, minwidth=150, stretch=False)
+        self.history_tree.column('预览', width=300, minwidth=200, stretch=True)
         
         # 滚动条
         tree_scrollbar = ttk.Scrollbar(left_frame, orient=VERTICAL, command=self.history_tree.yview)
-        self.history_tree.configure(yscrollcommand=tree_scrollbar.set)
+        # 滚动或尺寸变化时填充新进入可见区域的行
+        self.history_tree.configure(yscrollcommand=lambda *args: (tree_scrollbar.set(*args), self._render_visible()))
         
         self.history_tree.pack(side=LEFT, fill=BOTH, expand=True)
         tree_scrollbar.pack(side=RIGHT, fill=Y)
@@ -999,6 +1587,10 @@ class HistoryWindow:
         # 关闭按钮
         close_btn = ttk.Button(button_frame, text="关闭", command=self.close_window)
         close_btn.pack(side=RIGHT)
+        
+        # 状态栏，显示选择/删除结果，不弹出模态对话框
+        self.status_var = tk.StringVar()
+        ttk.Label(main_frame, textvariable=self.status_var, anchor=W).pack(fill=X, pady=(5, 0))
     
     def center_window(self):
         """居中显示窗口"""
@@ -1011,40 +1603,128 @@ class HistoryWindow:
     
     def load_history_data(self):
         """加载历史记录数据"""
-        # 清空现有数据
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
-        
-        # 加载历史记录（倒序显示，最新的在前面）
-        for i, item in enumerate(reversed(self.history)):
-            preview_text = item['text'][:50] + "..." if len(item['text']) > 50 else item['text']
-            preview_text = preview_text.replace('\n', ' ')  # 替换换行符
-            
-            self.history_tree.insert('', 'end', 
-                                   text=str(len(self.history) - i),
-                                   values=(item['timestamp'], preview_text),
-                                   tags=(str(len(self.history) - 1 - i),))  # 使用原始索引作为tag
+        # 历史记录可能已被主窗口修改，重建搜索索引和文件缓存
+        self._search_index = None
+        self._files_dir_cache = None
+        # 倒序显示，最新的在前面
+        self._populate_rows(range(len(self.history) - 1, -1, -1))
+    
+    def _files_set(self):
+        """扫描files目录及其日期子目录，返回规范化后的图片路径集合"""
+        if self._files_dir_cache is None:
+            paths = set()
+            try:
+                with os.scandir("files") as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            with os.scandir(entry.path) as sub_entries:
+                                paths.update(os.path.normpath(e.path) for e in sub_entries if e.is_file())
+                        elif entry.is_file():
+                            paths.add(os.path.normpath(entry.path))
+            except OSError:
+                pass
+            self._files_dir_cache = paths
+        return self._files_dir_cache
+    
+    def _image_exists(self, image_path):
+        """files目录下的图片查目录缓存，其它位置的图片退回os.path.exists"""
+        path = os.path.normpath(image_path)
+        if path.startswith("files" + os.sep):
+            return path in self._files_set()
+        return os.path.exists(image_path)
+    
+    def _populate_rows(self, indices):
+        """按历史记录索引插入占位行（只设置序号），内容由_render_visible按需填充"""
+        self.history_tree.delete(*self.history_tree.get_children())
+        self._row_cache = []
+        self._rendered = set()
+        self._iid_to_index = {}
+        self._detail_current_index = None
+        # 批量插入期间隐藏数据列，避免每插入一行都重新布局
+        self.history_tree.configure(displaycolumns=())
+        try:
+            # 拼成一段Tcl脚本一次提交，省去逐行insert的Python/Tcl往返；iid由原始索引生成
+            widget = self.history_tree._w
+            script = []
+            for index in indices:
+                iid = f"r{index}"
+                script.append(f"{widget} insert {{}} end -id {iid} -text {index + 1}")
+                self._row_cache.append((iid, index))
+                self._iid_to_index[iid] = index
+            if script:
+                self.history_tree.tk.eval("\n".join(script))
+        finally:
+            self.history_tree.configure(displaycolumns=('时间', '预览'))
+        self._render_visible()
+    
+    def _remove_rows(self, deleted_indices):
+        """删除记录后只移除对应的行，并修正其余行的序号和索引"""
+        deleted = sorted(deleted_indices)
+        deleted_set = set(deleted)
+        row_cache, rendered, removed = [], set(), []
+        # 序号即索引+1，只有比被删记录更新的行需要改序号，合并成一段Tcl脚本提交
+        widget = self.history_tree._w
+        script = []
+        for pos, (iid, index) in enumerate(self._row_cache):
+            if index in deleted_set:
+                removed.append(iid)
+                del self._iid_to_index[iid]
+                continue
+            shift = bisect.bisect_left(deleted, index)
+            if shift:
+                index -= shift
+                self._iid_to_index[iid] = index
+                script.append(f"{widget} item {iid} -text {index + 1}")
+            if pos in self._rendered:
+                rendered.add(len(row_cache))
+            row_cache.append((iid, index))
+        if removed:
+            self.history_tree.delete(*removed)
+        if script:
+            self.history_tree.tk.eval("\n".join(script))
+        self._row_cache, self._rendered = row_cache, rendered
+        # 索引已变化，下次选择时重新显示详情
+        self._detail_current_index = None
+        self._render_visible()
+    
+    def _render_visible(self):
+        """只填充当前可见区域（加少量预读）的行内容"""
+        total = len(self._row_cache)
+        if not total:
+            return
+        first, last = self.history_tree.yview()
+        overscan = 10
+        # 窗口尚未布局时yview返回(0, 1)，限制单次填充的行数
+        visible = min(int((last - first) * total) + 1, 200)
+        start = max(0, int(first * total) - overscan)
+        end = min(total, int(first * total) + visible + overscan)
+        for pos in range(start, end):
+            if pos in self._rendered:
+                continue
+            iid, index = self._row_cache[pos]
+            item = _history_cache(self.history[index])
+            self.history_tree.item(iid, values=(item['timestamp'], item['_preview']))
+            self._rendered.add(pos)
     
     def on_search(self, event=None):
-        """搜索功能"""
+        """搜索功能（输入停止200ms后再执行）"""
+        if self._search_after_id:
+            self.window.after_cancel(self._search_after_id)
+        self._search_after_id = self.window.after(200, self._do_search)
+    
+    def _do_search(self):
+        self._search_after_id = None
         search_text = self.search_var.get().lower()
         
-        # 清空现有数据
-        for item in self.history_tree.get_children():
-            self.history_tree.delete(item)
+        if self._search_index is None:
+            self._search_index = [(_history_cache(item)['_text_lower'], item['timestamp'].lower(), i)
+                                  for i, item in enumerate(self.history)]
         
-        # 过滤并显示匹配的记录
-        for i, item in enumerate(reversed(self.history)):
-            if (search_text in item['text'].lower() or 
-                search_text in item['timestamp'].lower()):
-                
-                preview_text = item['text'][:50] + "..." if len(item['text']) > 50 else item['text']
-                preview_text = preview_text.replace('\n', ' ')
-                
-                self.history_tree.insert('', 'end',
-                                       text=str(len(self.history) - i),
-                                       values=(item['timestamp'], preview_text),
-                                       tags=(str(len(self.history) - 1 - i),))
+        # 子串查找在C层完成，直接扫描小写缓存即可；逐条建3-gram集合的内存和构建开销远大于扫描本身
+        self._populate_rows(
+            index for text_lower, timestamp_lower, index in reversed(self._search_index)
+            if search_text in text_lower or search_text in timestamp_lower
+        )
     
     def on_item_select(self, event):
         """选择项目事件"""
@@ -1053,9 +1733,8 @@ class HistoryWindow:
             # 如果只选择了一个项目，显示详情
             if len(selection) == 1:
                 item_id = selection[0]
-                tags = self.history_tree.item(item_id, 'tags')
-                if tags:
-                    index = int(tags[0])
+                index = self._iid_to_index.get(item_id)
+                if index is not None:
                     self.show_detail(index)
                     
                     # 启用单项操作按钮
@@ -1064,6 +1743,7 @@ class HistoryWindow:
                     self.delete_btn.config(state=NORMAL)
             else:
                 # 多选时清空详情显示
+                self._detail_current_index = None
                 self.detail_text.delete(1.0, tk.END)
                 self.detail_image_label.configure(image="", text="已选择多条记录")
                 self.detail_image_label.image = None
@@ -1084,7 +1764,11 @@ class HistoryWindow:
     
     def show_detail(self, index):
         """显示详细信息"""
+        # 仍是当前显示的记录时不重写文本，避免大段文本重新排版
+        if index == self._detail_current_index:
+            return
         if 0 <= index < len(self.history):
+            self._detail_current_index = index
             item = self.history[index]
             
             # 显示文本
@@ -1092,7 +1776,7 @@ class HistoryWindow:
             self.detail_text.insert(1.0, item['text'])
             
             # 显示图片
-            if 'image_path' in item and os.path.exists(item['image_path']):
+            if 'image_path' in item and self._image_exists(item['image_path']):
                 self.display_detail_image(item['image_path'])
                 self.current_image_path = item['image_path']  # 保存当前图片路径
             else:
@@ -1101,23 +1785,9 @@ class HistoryWindow:
                 self.current_image_path = None
     
     def display_detail_image(self, image_path):
-        """显示详情图片"""
+        """显示详情图片（缩略图按路径和修改时间缓存）"""
         try:
-            image = Image.open(image_path)
-            
-            # 计算缩放比例
-            max_width = 300
-            max_height = 150
-            
-            orig_width, orig_height = image.size
-            width_ratio = max_width / orig_width
-            height_ratio = max_height / orig_height
-            scale_ratio = min(width_ratio, height_ratio, 1.0)
-            
-            new_width = int(orig_width * scale_ratio)
-            new_height = int(orig_height * scale_ratio)
-            
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            image = _thumb(image_path, os.path.getmtime(image_path), 300, 150)
             photo = ImageTk.PhotoImage(image)
             
             self.detail_image_label.configure(image=photo, text="")
@@ -1128,7 +1798,7 @@ class HistoryWindow:
     
     def on_image_click(self, event):
         """图片点击事件 - 打开放大预览"""
-        if self.current_image_path and os.path.exists(self.current_image_path):
+        if self.current_image_path and self._image_exists(self.current_image_path):
             try:
                 # 打开图片放大预览窗口
                 ImageZoomWindow(self.current_image_path, self.window)
@@ -1137,40 +1807,13 @@ class HistoryWindow:
         else:
             messagebox.showwarning("提示", "没有可预览的图片")
     
-    def display_detail_image(self, image_path):
-        """显示详情图片"""
-        try:
-            image = Image.open(image_path)
-            
-            # 计算缩放比例
-            max_width = 300
-            max_height = 150
-            
-            orig_width, orig_height = image.size
-            width_ratio = max_width / orig_width
-            height_ratio = max_height / orig_height
-            scale_ratio = min(width_ratio, height_ratio, 1.0)
-            
-            new_width = int(orig_width * scale_ratio)
-            new_height = int(orig_height * scale_ratio)
-            
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(image)
-            
-            self.detail_image_label.configure(image=photo, text="")
-            self.detail_image_label.image = photo
-            
-        except Exception as e:
-            self.detail_image_label.configure(image="", text=f"图片加载失败: {str(e)}")
-    
     def use_selected(self):
         """使用选中的记录"""
         selection = self.history_tree.selection()
         if selection:
             item_id = selection[0]
-            tags = self.history_tree.item(item_id, 'tags')
-            if tags:
-                index = int(tags[0])
+            index = self._iid_to_index.get(item_id)
+            if index is not None:
                 if 0 <= index < len(self.history):
                     item = self.history[index]
                     self.callback(item)
@@ -1178,7 +1821,12 @@ class HistoryWindow:
     
     def copy_detail_text(self):
         """复制详情文本"""
-        text = self.detail_text.get(1.0, tk.END).strip()
+        # 直接从历史记录取文本，不必从Text控件读回整段内容
+        index = self._detail_current_index
+        if index is not None and 0 <= index < len(self.history):
+            text = self.history[index]['text'].strip()
+        else:
+            text = self.detail_text.get(1.0, tk.END).strip()
         if text:
             self.window.clipboard_clear()
             self.window.clipboard_append(text)
@@ -1190,28 +1838,23 @@ class HistoryWindow:
         if selection:
             if messagebox.askyesno("确认删除", "确定要删除这条记录吗？"):
                 item_id = selection[0]
-                tags = self.history_tree.item(item_id, 'tags')
-                if tags:
-                    index = int(tags[0])
+                index = self._iid_to_index.get(item_id)
+                if index is not None:
                     if 0 <= index < len(self.history):
                         # 获取要删除的记录
                         record = self.history[index]
                         
-                        # 删除对应的图片文件
+                        # 在后台删除对应的图片文件
                         if 'image_path' in record and record['image_path']:
-                            try:
-                                if os.path.exists(record['image_path']):
-                                    os.remove(record['image_path'])
-                                    print(f"已删除图片文件: {record['image_path']}")
-                            except Exception as e:
-                                print(f"删除图片文件失败: {e}")
+                            self._unlink_in_background([record['image_path']])
                         
                         # 删除记录
                         del self.history[index]
+                        self._search_index = None
                         self.parent.save_history()
                         
-                        # 刷新显示
-                        self.load_history_data()
+                        # 只移除被删除的行
+                        self._remove_rows([index])
                         
                         # 清空详情
                         self.detail_text.delete(1.0, tk.END)
@@ -1237,7 +1880,7 @@ class HistoryWindow:
             self.delete_all_selected_btn.config(state=NORMAL)
             
             # 显示选择数量
-            messagebox.showinfo("全选", f"已选择 {len(all_items)} 条记录")
+            self.status_var.set(f"已选择 {len(all_items)} 条记录")
         else:
             messagebox.showinfo("提示", "没有记录可选择")
     
@@ -1259,9 +1902,8 @@ class HistoryWindow:
         files_to_delete = []
         
         for item_id in selected_items:
-            tags = self.history_tree.item(item_id, 'tags')
-            if tags:
-                index = int(tags[0])
+            index = self._iid_to_index.get(item_id)
+            if index is not None:
                 if 0 <= index < len(self.history):
                     indices_to_delete.append(index)
                     
@@ -1273,26 +1915,19 @@ class HistoryWindow:
         # 按索引从大到小排序，避免删除时索引变化
         indices_to_delete.sort(reverse=True)
         
-        # 删除图片文件
-        deleted_files = 0
-        for file_path in files_to_delete:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-                    deleted_files += 1
-                    print(f"已删除图片文件: {file_path}")
-            except Exception as e:
-                print(f"删除图片文件失败: {file_path}, 错误: {e}")
+        # 在后台删除图片文件，界面立即更新
+        self._unlink_in_background(files_to_delete)
         
         # 删除历史记录（从后往前删除）
         for index in indices_to_delete:
             del self.history[index]
+        self._search_index = None
         
         # 保存历史记录
         self.parent.save_history()
         
-        # 刷新显示
-        self.load_history_data()
+        # 只移除被删除的行
+        self._remove_rows(indices_to_delete)
         
         # 清空详情
         self.detail_text.delete(1.0, tk.END)
@@ -1306,79 +1941,91 @@ class HistoryWindow:
         self.delete_all_selected_btn.config(state=DISABLED)
         
         # 显示删除结果
-        messagebox.showinfo("删除完成", f"已删除 {len(indices_to_delete)} 条记录和 {deleted_files} 个图片文件")
+        self.status_var.set(f"已删除 {len(indices_to_delete)} 条记录，{len(files_to_delete)} 个图片文件正在后台删除")
     
-    def close_window(self):
-        """关闭窗口"""
-        try:
-            # 如果还有任务在处理中，询问是否确认关闭
-            if self.current_task or self.task_queue:
-                if not messagebox.askyesno("确认", "还有任务正在处理，确定要关闭吗？"):
-                    return
-                
-                # 如果确认关闭，先保存当前已完成的结果到历史记录
-                for file_info in self.file_list:
-                    if file_info['result'] and 'image_path' in file_info:
-                        # 确保这个结果已经保存到历史记录
-                        pass
-            
-            # 保存父窗口引用用于后续处理
-            parent = self.parent
-            parent_root = parent.root if parent else None
-            
-            # 重置父应用状态（直接调用，不等待窗口销毁后）
-            if parent:
-                parent.reset_app_state()
-            
-            # 清除对象引用，防止循环引用
-            self.parent = None
-            self.ocr_manager = None
-            self.task_queue = []
-            self.current_task = None
-            
-            # 先销毁窗口
-            if hasattr(self, 'window') and self.window.winfo_exists():
-                self.window.destroy()
-                
-            # 窗口销毁后，确保主窗口获得焦点
-            if parent_root and parent_root.winfo_exists():
-                # 等待事件循环处理完销毁事件
-                parent_root.after(100, lambda: self._restore_main_window(parent_root))
-        except Exception as e:
-            print(f"关闭批量OCR窗口时出错: {e}")
-            # 确保窗口被销毁
-            if hasattr(self, 'window') and self.window.winfo_exists():
-                self.window.destroy()
+    def _unlink_in_background(self, file_paths):
+        """启动后台线程删除图片文件，避免慢速磁盘阻塞界面"""
+        if self._files_dir_cache is not None:
+            self._files_dir_cache.difference_update(os.path.normpath(p) for p in file_paths)
+        if file_paths:
+            threading.Thread(target=self._bulk_unlink, args=(list(file_paths),), daemon=True).start()
+    
+    @staticmethod
+    def _bulk_unlink(file_paths):
+        deleted_files = 0
+        for file_path in file_paths:
+            try:
+                os.remove(file_path)
+                deleted_files += 1
+                print(f"已删除图片文件: {file_path}")
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                print(f"删除图片文件失败: {file_path}, 错误: {e}")
+        print(f"后台删除完成: {deleted_files}/{len(file_paths)} 个图片文件")
+    
+    def close_window(self):
+        """关闭窗口"""
+        if self._search_after_id:
+            self.window.after_cancel(self._search_after_id)
+            self._search_after_id = None
+        self.window.destroy()
+
+
+class OCRCache:
+    """按图片内容哈希缓存OCR文本，相同图片无需重复识别"""
+    def __init__(self, path, max_age_days=30):
+        self.path = path
+        self.max_age = max_age_days * 86400
+        self.entries = {}
+        self.dirty = False
+        self.load()
     
-    def _restore_main_window(self, main_window):
-        """恢复主窗口状态"""
+    @staticmethod
+    def digest(file_path):
+        """计算图片文件的内容哈希"""
+        h = hashlib.blake2b(digest_size=16)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+    
+    def load(self):
+        """加载缓存，丢弃过期条目"""
         try:
-            if main_window and main_window.winfo_exists():
-                # 确保主窗口可见
-                main_window.deiconify()
-                # 强制获得焦点
-                main_window.focus_force()
-                # 提升到前面
-                main_window.lift()
-                # 更新窗口
-                main_window.update()
+            with open(self.path, 'rb') as f:
+                entries = json_loads(f.read())
+        except FileNotFoundError:
+            return
         except Exception as e:
-            print(f"恢复主窗口时出错: {e}")
+            print(f"加载OCR缓存失败: {e}")
+            return
+        cutoff = datetime.now().timestamp() - self.max_age
+        self.entries = {k: v for k, v in entries.items() if v.get('time', 0) >= cutoff}
+        self.dirty = len(self.entries) != len(entries)
     
-    def update_progress_display(self):
-        """更新进度显示"""
-        # 更新总进度
-        completed = sum(1 for f in self.file_list if f['status'] == '处理完成')
-        total = len(self.file_list)
-        percent = 0 if total == 0 else int(completed / total * 100)
-        
-        self.total_progress['value'] = percent
-        self.progress_label.config(text=f"{completed}/{total} ({percent}%)")
-        
-        # 如果有完成的项，启用导出按钮
-        if completed > 0:
-            self.export_btn.config(state=NORMAL)
-
+    def get(self, key):
+        entry = self.entries.get(key)
+        return None if entry is None else entry['text']
+    
+    def put(self, key, text, img_path):
+        self.entries[key] = {'text': text, 'image_path': img_path, 'time': datetime.now().timestamp()}
+        self.dirty = True
+    
+    def clear(self):
+        self.entries.clear()
+        self.dirty = True
+        self.save()
+    
+    def save(self):
+        """有改动时写回缓存文件"""
+        if not self.dirty:
+            return
+        try:
+            write_file_atomic(self.path, json_dumps(self.entries))
+            self.dirty = False
+        except Exception as e:
+            print(f"保存OCR缓存失败: {e}")
 
 class OCRApp:
     def __init__(self):
@@ -1397,7 +2044,12 @@ class OCRApp:
         self.wechat_dir = f"{os.getcwd()}\\[3.9.9.35]"
         
         # 历史记录
-        self.history_file = "ocr_history.json"
+        self.history_file = "ocr_history.jsonl"
+        # 旧版本的整体JSON历史文件，首次启动时迁移
+        self.legacy_history_file = "ocr_history.json"
+        # 待追加到文件的记录，500ms内的多次新增合并为一次写入
+        self._history_pending = []
+        self._history_after_id = None
         self.history = self.load_history()
         
         # OCR管理器
@@ -1406,11 +2058,26 @@ class OCRApp:
         
         # 批量OCR相关
         self.is_batch_ocr = False
-        self.current_batch_file = None
         self.batch_window = None
         
+        # 框选识别中的裁剪图片及其原图
+        self.crop_path = None
+        self.current_main_image_path = None
+        
         # 确保files目录存在
         self.ensure_files_directory()
+        self._date_folder_cache = (None, None)
+        # 复制文件到files目录时选择文件名的锁（拖放和批量预取会在后台线程复制）
+        self._copy_lock = threading.Lock()
+        
+        # OCR结果缓存（内容哈希 -> 文本），以及已提交任务对应的哈希
+        self.ocr_cache = OCRCache(os.path.join("files", ".ocr_cache.json"))
+        self._pending_digests = {}
+        # 已提交、尚未收到结果的OCR任务数（不超过OCR_MAX_TASK_ID）
+        self._ocr_outstanding = 0
+        # 缩小后的临时识别图片 -> 原图路径
+        self._ocr_aliases = {}
+        self._cache_save_after_id = None
         
         self.setup_ui()
         self.setup_ocr()
@@ -1552,24 +2219,13 @@ class OCRApp:
             # 打开图片
             image = Image.open(image_path)
             
-            # 计算缩放比例，保持宽高比
+            # 限制预览尺寸，保持宽高比
             max_width = 400
             max_height = 200
             
-            # 获取原始尺寸
-            orig_width, orig_height = image.size
-            
-            # 计算缩放比例
-            width_ratio = max_width / orig_width
-            height_ratio = max_height / orig_height
-            scale_ratio = min(width_ratio, height_ratio, 1.0)  # 不放大
-            
-            # 计算新尺寸
-            new_width = int(orig_width * scale_ratio)
-            new_height = int(orig_height * scale_ratio)
-            
-            # 缩放图片
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # JPEG在解码时直接降采样，thumbnail原地缩放且不会放大
+            image.draft('RGB', (max_width * 2, max_height * 2))
+            image.thumbnail((max_width, max_height), Image.Resampling.BILINEAR)
             
             # 转换为PhotoImage
             photo = ImageTk.PhotoImage(image)
@@ -1609,6 +2265,107 @@ class OCRApp:
             messagebox.showerror("错误", f"OCR初始化失败: {str(e)}")
             self.status_label.config(text="OCR服务启动失败")
     
+    def _dispatch_ocr(self, path, on_failed=None, ocr_path=None):
+        """提交OCR任务（相同内容的图片直接使用缓存结果）。
+        ocr_path为与path内容相同、专供识别读取的临时文件（如旋转窗口输出的BMP），识别结束后删除"""
+        # 回调收到的是DoOCRTask转换后的绝对路径，待写缓存的哈希也按绝对路径登记
+        path = os.path.abspath(path)
+        # 相同内容的图片直接使用缓存结果
+        try:
+            digest = OCRCache.digest(path)
+        except OSError as e:
+            print(f"计算图片哈希失败: {e}")
+            digest = None
+        if digest is not None:
+            cached = self.ocr_cache.get(digest)
+            if cached is not None:
+                if ocr_path is not None:
+                    try:
+                        os.remove(ocr_path)
+                    except OSError:
+                        pass
+                    _TEMP_FILES.discard(ocr_path)
+                self.ocr_result_callback(path, {'ocrResult': [{'text': cached}], 'cached': True})
+                return
+            self._pending_digests[path] = digest
+        # 过大的图片先缩小，回调时再换回原路径
+        self._submit_ocr(self._prepare_for_ocr(path, ocr_path), on_failed)
+    
+    def _submit_ocr(self, ocr_path, on_failed=None, attempt=0):
+        """把准备好的图片交给OCR。任务队列已满（OCR_MAX_TASK_ID个任务在途）时指数退避重试；
+        DoOCRTask抛出的异常（服务未启动、文件不存在等）重试也不会恢复，直接按失败处理"""
+        if self._ocr_outstanding < OCR_MAX_TASK_ID:
+            try:
+                self.ocr_manager.DoOCRTask(ocr_path)
+            except queue.Empty:
+                # 部分wechat_ocr版本取不到空闲任务ID时等待1秒后抛出queue.Empty，同样按队列已满重试
+                pass
+            except Exception as e:
+                self._ocr_submit_failed(ocr_path, on_failed, e)
+                return
+            else:
+                self._ocr_outstanding += 1
+                return
+        # 队列满时DoOCRTask只打印提示并直接返回（任务被丢弃），所以提交前先检查，稍后用同一路径重试
+        if attempt < OCR_RETRY_ATTEMPTS:
+            delay = 200 * 2 ** attempt
+            print(f"OCR任务队列已满，{delay}ms后重试({attempt + 1}/{OCR_RETRY_ATTEMPTS})")
+            self.root.after(delay, lambda: self._submit_ocr(ocr_path, on_failed, attempt + 1))
+            return
+        self._ocr_submit_failed(ocr_path, on_failed, "OCR任务队列已满")
+    
+    def _ocr_submit_failed(self, ocr_path, on_failed, error):
+        """提交失败：清理临时图片和待写缓存的哈希，通知调用方"""
+        print(f"提交OCR任务失败: {error}")
+        path = self._release_ocr_path(ocr_path)
+        self._pending_digests.pop(path, None)
+        if on_failed:
+            on_failed(path)
+        else:
+            self.status_label.config(text="识别失败")
+    
+    def _prepare_for_ocr(self, path, source=None):
+        """返回实际交给OCR读取的路径：最长边超过OCR_MAX_SIDE时生成缩小的临时PNG，
+        否则使用source（与path内容相同的临时文件）或原路径。临时路径都记录在_ocr_aliases中"""
+        if source is not None:
+            # 先登记，任何分支返回其它路径时都能由_release_ocr_path删除它（键统一用绝对路径）
+            source = os.path.abspath(source)
+            self._ocr_aliases[source] = path
+        try:
+            with Image.open(source or path) as image:
+                if max(image.size) <= OCR_MAX_SIDE:
+                    return source or path
+                # JPEG可在解码时直接按比例缩小
+                image.draft('RGB', (OCR_MAX_SIDE, OCR_MAX_SIDE))
+                if image.mode not in ('1', 'L', 'RGB', 'RGBA'):
+                    image = image.convert('RGB')
+                image.thumbnail((OCR_MAX_SIDE, OCR_MAX_SIDE), Image.Resampling.LANCZOS)
+                fd, ocr_path = tempfile.mkstemp(prefix="temp_ocr_", suffix=".png", dir=os.getcwd())
+                os.close(fd)
+                _TEMP_FILES.add(ocr_path)
+                image.save(ocr_path, 'PNG', compress_level=1)
+        except Exception as e:
+            print(f"缩小识别图片失败，使用原图: {e}")
+            if source is not None:
+                self._release_ocr_path(source)
+            return path
+        if source is not None:
+            self._release_ocr_path(source)
+        self._ocr_aliases[ocr_path] = path
+        return ocr_path
+    
+    def _release_ocr_path(self, path):
+        """删除识别用的临时图片，返回对应的原图路径（path需为绝对路径）"""
+        original_path = self._ocr_aliases.pop(path, None)
+        if original_path is None:
+            return path
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        _TEMP_FILES.discard(path)
+        return original_path
+    
     def screenshot_ocr(self):
         """截屏OCR"""
         if not self.ocr_running:
@@ -1617,8 +2374,7 @@ class OCRApp:
             
         # 隐藏主窗口并确保它完全隐藏
         self.root.withdraw()
-        self.root.update_idletasks()  # 确保窗口状态更新
-        time.sleep(0.2)  # 给窗口足够的时间隐藏
+        self.root.update_idletasks()  # 确保窗口状态更新（截屏窗口会在截图前再等待一帧）
         
         def on_screenshot(image):
             # 即使出错也确保主窗口最终会显示
@@ -1632,7 +2388,7 @@ class OCRApp:
                     
                     # 执行OCR
                     self.status_label.config(text="正在识别...")
-                    self.ocr_manager.DoOCRTask(screenshot_path)
+                    self._dispatch_ocr(screenshot_path)
                 else:
                     messagebox.showerror("错误", "截屏保存失败")
             finally:
@@ -1669,7 +2425,7 @@ class OCRApp:
             self.display_image(copied_path)
             
             self.status_label.config(text="正在识别...")
-            self.ocr_manager.DoOCRTask(copied_path)
+            self._dispatch_ocr(copied_path)
     
     def rotation_ocr(self):
         """框选旋转OCR"""
@@ -1697,17 +2453,20 @@ class OCRApp:
             # 显示图片预览
             self.display_image(final_path)
             
+            ocr_path = None
             if selections:
                 # 如果有框选区域，按顺序处理每个区域
                 self.process_selections_ocr(final_path, selections)
             else:
-                # 没有框选，直接OCR整个图片
+                # 没有框选，直接OCR整个图片（旋转窗口输出的临时文件仍在时交给OCR读取，识别完再删除）
                 self.status_label.config(text="正在识别...")
-                self.ocr_manager.DoOCRTask(final_path)
+                if processed_path != final_path and processed_path in _TEMP_FILES:
+                    ocr_path = processed_path
+                self._dispatch_ocr(final_path, ocr_path=ocr_path)
             
             # 清理临时文件
             try:
-                if os.path.exists(processed_path) and processed_path.startswith("temp_"):
+                if ocr_path is None and os.path.exists(processed_path) and os.path.basename(processed_path).startswith("temp_"):
                     os.remove(processed_path)
             except:
                 pass
@@ -1732,9 +2491,13 @@ class OCRApp:
             filename = f"rotated_{timestamp}.png"
             final_path = os.path.join(date_folder, filename)
             
-            # 复制文件
-            import shutil
-            shutil.copy2(temp_path, final_path)
+            if temp_path.lower().endswith('.png'):
+                # 移入files目录（只移动程序自己创建的临时文件）
+                _fast_copy(temp_path, final_path, move=temp_path in _TEMP_FILES)
+            else:
+                # 识别用的BMP临时文件不作为历史图片保存，另存一份PNG（临时文件由调用方交给OCR后删除）
+                with Image.open(temp_path) as image:
+                    image.save(final_path, 'PNG', compress_level=1)
             
             return final_path
         except Exception as e:
@@ -1744,8 +2507,6 @@ class OCRApp:
     def process_selections_ocr(self, image_path, selections):
         """处理框选区域的OCR"""
         try:
-            from PIL import Image
-            
             # 打开图片
             image = Image.open(image_path)
             
@@ -1758,46 +2519,62 @@ class OCRApp:
                 # 保存裁剪的图片
                 crop_filename = f"crop_1_{datetime.now().strftime('%H%M%S')}.png"
                 crop_path = os.path.join(self.get_date_folder_path(), crop_filename)
-                cropped.save(crop_path)
+                cropped.save(crop_path, compress_level=1)
                 
-                # 直接OCR这个区域
-                self.status_label.config(text="正在识别框选区域...")
-                self.ocr_manager.DoOCRTask(crop_path)
-                
-                # 保存路径用于清理
+                # 保存路径用于回调识别和清理（须在提交前设置）
                 self.crop_path = crop_path
                 self.current_main_image_path = image_path
+                
+                # 直接OCR这个区域
+                self.status_label.config(text="正在识别框选区域...")
+                self._dispatch_ocr(crop_path)
             else:
                 # 无框选区域，直接OCR整个图片
                 self.status_label.config(text="正在识别...")
-                self.ocr_manager.DoOCRTask(image_path)
+                self._dispatch_ocr(image_path)
                 
         except Exception as e:
             messagebox.showerror("错误", f"处理框选区域失败: {str(e)}")
             self.status_label.config(text="识别失败")
     
     def ocr_result_callback(self, img_path: str, results: dict):
-        """OCR结果回调"""
+        """OCR结果回调（在OCR回调线程中调用，所有处理都转到主线程）"""
         def update_ui():
+            nonlocal img_path
+            # DoOCRTask会把路径转成绝对路径后再提交，这里统一规范化；
+            # 缩小后送识别的图片换回原图路径（_ocr_aliases只在主线程中读写）
+            img_path = self._release_ocr_path(os.path.abspath(img_path))
+            if not results.get('cached'):
+                self._ocr_outstanding = max(0, self._ocr_outstanding - 1)
+            
             # 提取文本
-            text_results = []
-            if 'ocrResult' in results:
-                # 按Y坐标排序，然后按X坐标排序（从上到下，从左到右）
-                ocr_items = results['ocrResult']
-                sorted_items = sorted(ocr_items, key=lambda x: (x.get('location', {}).get('y', 0), x.get('location', {}).get('x', 0)))
-                for item in sorted_items:
-                    if 'text' in item:
-                        text_results.append(item['text'])
+            # 按Y坐标排序，然后按X坐标排序（从上到下，从左到右）
+            # 预先算好(y, x, 序号)排序键，序号保证坐标相同时保持原顺序且不会比较到文本
+            decorated = []
+            for i, item in enumerate(results.get('ocrResult', ())):
+                if 'text' in item:
+                    location = item.get('location') or {}
+                    decorated.append((location.get('y', 0), location.get('x', 0), i, item['text']))
+            decorated.sort()
+            text_results = [entry[3] for entry in decorated]
             
             ocr_text = '\n'.join(text_results)
             
-            # 检查是否是批量处理模式
-            if self.is_batch_ocr and self.current_batch_file:
+            # 写入结果缓存
+            digest = self._pending_digests.pop(img_path, None)
+            if digest is not None and 'ocrResult' in results:
+                self.ocr_cache.put(digest, ocr_text, img_path)
+                self._schedule_cache_save()
+            
+            # 检查是否是批量处理模式（按图片路径找回对应的批量任务）
+            batch_window = self.batch_window if self.is_batch_ocr else None
+            batch_file = batch_window.in_flight.pop(img_path, None) if batch_window else None
+            if self.is_batch_ocr and (batch_file is not None or batch_window is None):
                 # 检查批量OCR窗口是否仍然存在
-                if self.batch_window and hasattr(self.batch_window, 'window') and self.batch_window.window.winfo_exists():
+                if batch_window and batch_window.window.winfo_exists():
                     try:
                         # 批量OCR结果处理
-                        self.batch_window.on_file_processed(self.current_batch_file, ocr_text, img_path)
+                        batch_window.on_file_processed(batch_file, ocr_text, img_path)
                     except Exception as e:
                         print(f"批量OCR回调处理错误: {e}")
                         # 如果出错，重置应用状态
@@ -1811,21 +2588,20 @@ class OCRApp:
                         'text': ocr_text,
                         'raw_result': {'type': 'batch_ocr', 'window_closed': True}
                     }
-                    self.history.append(history_item)
-                    self.save_history()
+                    self._append_history(history_item)
                     
                     # 窗口已关闭，确保状态重置
                     self.reset_app_state()
                 
+                # 批量结果只在批量窗口中显示，不改动主窗口结果框
                 return
             
-            # 检查是否是框选区域的处理
-            if hasattr(self, 'crop_path') and self.crop_path == img_path:
+            # 更新结果显示（一次replace代替delete+insert）
+            self.result_text.replace(1.0, tk.END, ocr_text)
+            
+            # 检查是否是框选区域的处理（crop_path是相对路径，回调给出绝对路径）
+            if self.crop_path and os.path.abspath(self.crop_path) == os.path.abspath(img_path):
                 # 框选OCR结果
-                # 更新结果显示
-                self.result_text.delete(1.0, tk.END)
-                self.result_text.insert(1.0, ocr_text)
-                
                 # 添加到历史记录
                 history_item = {
                     'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1833,28 +2609,23 @@ class OCRApp:
                     'text': ocr_text,
                     'raw_result': {'type': 'selection_ocr', 'selection': True}
                 }
-                self.history.append(history_item)
-                self.save_history()
+                self._append_history(history_item)
                 
                 # 清理临时文件
                 try:
-                    if os.path.exists(self.crop_path):
-                        os.remove(self.crop_path)
+                    os.remove(self.crop_path)
+                except FileNotFoundError:
+                    pass
                 except Exception as e:
                     print(f"删除临时文件失败: {e}")
                 
                 # 清理临时变量
-                delattr(self, 'crop_path')
-                if hasattr(self, 'current_main_image_path'):
-                    delattr(self, 'current_main_image_path')
+                self.crop_path = None
+                self.current_main_image_path = None
                 
                 self.status_label.config(text="框选识别完成")
             else:
                 # 普通OCR结果
-                # 更新结果显示
-                self.result_text.delete(1.0, tk.END)
-                self.result_text.insert(1.0, ocr_text)
-                
                 # 添加到历史记录
                 history_item = {
                     'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
@@ -1862,29 +2633,105 @@ class OCRApp:
                     'text': ocr_text,
                     'raw_result': results
                 }
-                self.history.append(history_item)
-                self.save_history()
+                self._append_history(history_item)
                 
                 self.status_label.config(text="识别完成")
         
         # 在主线程中更新UI
         self.root.after(0, update_ui)
     
+    def _schedule_cache_save(self):
+        """合并短时间内的多次缓存写入"""
+        if self._cache_save_after_id is None:
+            self._cache_save_after_id = self.root.after(2000, self._save_cache)
+    
+    def _save_cache(self):
+        self._cache_save_after_id = None
+        self.ocr_cache.save()
+    
     def load_history(self):
-        """加载历史记录"""
-        if os.path.exists(self.history_file):
-            try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        """加载历史记录（JSONL按时间正序逐行追加，内存中顺序相同）"""
+        if not os.path.exists(self.history_file):
+            return self._migrate_legacy_history()
+        history = []
+        damaged = False
+        try:
+            with open(self.history_file, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    if not line.endswith(b'\n'):
+                        damaged = True
+                    try:
+                        history.append(json_loads(line))
+                    except ValueError:
+                        # 跳过写了一半的行（如程序异常退出）
+                        print("跳过损坏的历史记录行")
+                        damaged = True
+        except OSError as e:
+            print(f"加载历史记录失败: {e}")
+            return []
+        if damaged:
+            # 末尾残留半行时直接追加会把新记录接在坏行后面，先整体重写一次
+            self.history = history
+            self.save_history()
+        return history
+    
+    def _migrate_legacy_history(self):
+        """读取旧版ocr_history.json并转存为JSONL"""
+        if not os.path.exists(self.legacy_history_file):
+            return []
+        try:
+            with open(self.legacy_history_file, 'rb') as f:
+                history = json_loads(f.read())
+        except Exception as e:
+            print(f"加载旧版历史记录失败: {e}")
+            return []
+        self.history = history
+        self.save_history()
+        return history
+    
+    @staticmethod
+    def _history_record(item):
+        """去掉界面用的缓存字段"""
+        return {k: v for k, v in item.items() if not k.startswith('_')}
+    
+    def _append_history(self, item):
+        """新增一条历史记录，稍后统一追加到文件末尾（追加在末尾，已打开的历史窗口中的索引保持不变）"""
+        self.history.append(item)
+        self._history_pending.append(json_dumps_line(self._history_record(item)))
+        if self._history_after_id is None:
+            self._history_after_id = self.root.after(500, self._flush_history)
+    
+    def _flush_history(self):
+        """把待追加的记录一次写入文件（也可直接调用以立即写入）"""
+        if self._history_after_id is not None:
+            self.root.after_cancel(self._history_after_id)
+            self._history_after_id = None
+        if not self._history_pending:
+            return
+        data = b''.join(self._history_pending)
+        self._history_pending = []
+        try:
+            with open(self.history_file, 'ab') as f:
+                f.write(data)
+        except Exception as e:
+            print(f"保存历史记录失败: {e}")
+    
+    def _cancel_history_flush(self):
+        """整体重写时丢弃待追加的记录（它们已包含在self.history中）"""
+        self._history_pending = []
+        if self._history_after_id is not None:
+            self.root.after_cancel(self._history_after_id)
+            self._history_after_id = None
     
     def save_history(self):
-        """保存历史记录"""
+        """整体重写历史记录文件（删除/清空记录后压缩）"""
+        self._cancel_history_flush()
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, ensure_ascii=False, indent=2)
+            # 文件中按时间正序保存，便于之后追加
+            data = b''.join(json_dumps_line(self._history_record(item)) for item in self.history)
+            write_file_atomic(self.history_file, data)
         except Exception as e:
             print(f"保存历史记录失败: {e}")
     
@@ -1895,14 +2742,16 @@ class OCRApp:
             os.makedirs(files_dir)
     
     def get_date_folder_path(self):
-        """获取当前日期的文件夹路径"""
+        """获取当前日期的文件夹路径（同一天内只创建一次）"""
         today = datetime.now().strftime("%Y-%m-%d")
+        if self._date_folder_cache[0] == today:
+            return self._date_folder_cache[1]
         date_folder = os.path.join("files", today)
         
         # 确保日期文件夹存在
-        if not os.path.exists(date_folder):
-            os.makedirs(date_folder)
+        os.makedirs(date_folder, exist_ok=True)
         
+        self._date_folder_cache = (today, date_folder)
         return date_folder
     
     def save_image_to_files(self, image, image_type="screenshot"):
@@ -1933,45 +2782,21 @@ class OCRApp:
             # 确保目录存在且可写
             os.makedirs(date_folder, exist_ok=True)
             
-            # 安全复制图像对象以避免修改原始图像
-            try:
-                image_copy = image.copy()
-            except Exception as e:
-                print(f"复制图像失败，尝试使用原始图像: {e}")
-                image_copy = image
+            # 以下转换都返回新图像，不会修改原图，无需复制
+            image_copy = image
+            # 保存的图片主要供识别用，使用最快的压缩级别（optimize会多次压缩，耗时数倍）
+            png_options = {'compress_level': 1}
             
-            # 保存图片，使用更兼容的格式
+            # 保存图片：PNG原生支持透明通道和调色板，这些模式直接保存，其它模式（如CMYK）转为RGB
             try:
-                if image_copy.mode in ('RGBA', 'LA', 'P'):
-                    # 创建RGB图像
-                    rgb_image = Image.new('RGB', image_copy.size, (255, 255, 255))
-                    # 适当处理调色板模式
-                    if image_copy.mode == 'P':
-                        try:
-                            image_copy = image_copy.convert('RGBA')
-                        except:
-                            image_copy = image_copy.convert('RGB')
-                    
-                    # 使用安全的paste方法
-                    try:
-                        if image_copy.mode == 'RGBA' or image_copy.mode == 'LA':
-                            mask = image_copy.split()[-1]
-                            rgb_image.paste(image_copy, (0, 0), mask)
-                        else:
-                            rgb_image.paste(image_copy, (0, 0))
-                    except Exception as e:
-                        print(f"图像混合失败，尝试直接转换: {e}")
-                        rgb_image = image_copy.convert('RGB')
-                    
-                    # 保存RGB图像
-                    rgb_image.save(file_path, 'PNG', optimize=True)
-                else:
-                    image_copy.save(file_path, 'PNG', optimize=True)
+                if image_copy.mode not in PNG_NATIVE_MODES:
+                    image_copy = image_copy.convert('RGB')
+                image_copy.save(file_path, 'PNG', **png_options)
             except Exception as e:
                 print(f"保存图像失败，尝试其他方法: {e}")
                 # 尝试直接转换为RGB再保存
                 try:
-                    image_copy.convert('RGB').save(file_path, 'PNG', optimize=True)
+                    image_copy.convert('RGB').save(file_path, 'PNG', **png_options)
                 except Exception as inner_e:
                     raise Exception(f"所有保存尝试都失败: {inner_e}")
             
@@ -1992,7 +2817,7 @@ class OCRApp:
                 
                 # 直接尝试最简单的保存方法
                 try:
-                    image.convert('RGB').save(backup_path, 'PNG')
+                    image.convert('RGB').save(backup_path, 'PNG', compress_level=1)
                     print(f"使用备用方案保存到: {backup_path}")
                     return backup_path
                 except Exception as save_error:
@@ -2004,7 +2829,7 @@ class OCRApp:
                 return None
     
     def copy_file_to_files(self, source_path):
-        """将选择的文件复制到files文件夹中"""
+        """将选择的文件复制到files文件夹中（可在后台线程调用）"""
         try:
             # 获取日期文件夹路径
             date_folder = self.get_date_folder_path()
@@ -2017,12 +2842,19 @@ class OCRApp:
             timestamp = datetime.now().strftime("%H%M%S")
             new_filename = f"selected_{timestamp}_{name}{ext}"
             new_path = os.path.join(date_folder, new_filename)
+            # 批量并发时同一秒内可能出现同名文件，追加序号避免覆盖
+            # 加锁保证后台线程与主线程不会选中同一个文件名
+            with self._copy_lock:
+                counter = 1
+                while os.path.exists(new_path):
+                    new_path = os.path.join(date_folder, f"selected_{timestamp}_{name}_{counter}{ext}")
+                    counter += 1
+                
+                # 复制文件
+                _fast_copy(source_path, new_path)
             
-            # 复制文件
-            import shutil
-            shutil.copy2(source_path, new_path)
-            
-            return new_path
+            # 返回绝对路径：DoOCRTask回调给出的都是绝对路径，保持一致才能按路径找回任务
+            return os.path.abspath(new_path)
         except Exception as e:
             print(f"复制文件失败: {e}")
             return source_path  # 如果复制失败，返回原路径
@@ -2040,20 +2872,42 @@ class OCRApp:
     def clear_history(self):
         """清空历史记录"""
         if messagebox.askyesno("确认", "确定要清空所有历史记录吗？同时会删除对应的图片文件。"):
-            # 删除所有对应的图片文件
+            # 删除所有对应的图片文件：files目录下按所在文件夹分组，每个文件夹只扫描一次
             deleted_files = 0
+            by_folder = collections.defaultdict(set)
             for record in self.history:
-                if 'image_path' in record and record['image_path']:
-                    try:
-                        if os.path.exists(record['image_path']):
-                            os.remove(record['image_path'])
+                if record.get('image_path'):
+                    path = os.path.normpath(record['image_path'])
+                    if path.startswith("files" + os.sep):
+                        by_folder[os.path.dirname(path)].add(path)
+                    else:
+                        # files目录以外的图片逐个删除，避免扫描用户的大目录
+                        try:
+                            os.remove(path)
                             deleted_files += 1
-                    except Exception as e:
-                        print(f"删除图片文件失败: {record['image_path']}, 错误: {e}")
+                        except FileNotFoundError:
+                            pass
+                        except Exception as e:
+                            print(f"删除图片文件失败: {path}, 错误: {e}")
+            for folder, targets in by_folder.items():
+                try:
+                    with os.scandir(folder) as entries:
+                        for entry in entries:
+                            if os.path.normpath(entry.path) in targets and entry.is_file():
+                                try:
+                                    os.unlink(entry.path)
+                                    deleted_files += 1
+                                except Exception as e:
+                                    print(f"删除图片文件失败: {entry.path}, 错误: {e}")
+                except OSError:
+                    # 文件夹已不存在
+                    pass
             
             # 清空历史记录
             self.history.clear()
             self.save_history()
+            self.ocr_cache.clear()
+            shutil.rmtree(THUMBS_DIR, ignore_errors=True)
             self.result_text.delete(1.0, tk.END)
             
             # 清空图片预览
@@ -2068,6 +2922,8 @@ class OCRApp:
     
     def on_closing(self):
         """关闭应用"""
+        self._flush_history()
+        self.ocr_cache.save()
         if self.ocr_running and self.ocr_manager:
             self.ocr_manager.KillWeChatOCR()
         self.root.destroy()
@@ -2105,7 +2961,6 @@ class OCRApp:
         """重置应用状态，确保所有功能正常工作"""
         # 重置批量OCR相关状态
         self.is_batch_ocr = False
-        self.current_batch_file = None
         if hasattr(self, 'batch_window') and self.batch_window is not None:
             # 尝试清理可能存在的批量窗口引用
             self.batch_window = None
@@ -2143,7 +2998,6 @@ class OCRApp:
         # 隐藏主窗口进行截屏
         self.root.withdraw()
         self.root.update_idletasks()
-        time.sleep(0.2)
         
         def on_screenshot(image):
             try:
@@ -2164,17 +3018,20 @@ class OCRApp:
                     # 显示图片预览
                     self.display_image(final_path)
                     
+                    ocr_path = None
                     if selections:
                         # 有框选时按区域识别
                         self.process_selections_ocr(final_path, selections)
                     else:
-                        # 无框选识别整图
+                        # 无框选识别整图（临时文件交给OCR读取，识别完再删除）
                         self.status_label.config(text="正在识别...")
-                        self.ocr_manager.DoOCRTask(final_path)
+                        if processed_path != final_path and processed_path in _TEMP_FILES:
+                            ocr_path = processed_path
+                        self._dispatch_ocr(final_path, ocr_path=ocr_path)
                     
                     # 清理临时文件
                     try:
-                        if os.path.exists(processed_path) and processed_path.startswith("temp_"):
+                        if ocr_path is None and os.path.exists(processed_path) and os.path.basename(processed_path).startswith("temp_"):
                             os.remove(processed_path)
                     except:
                         pass
@@ -2222,8 +3079,8 @@ class OCRApp:
             # 解析拖放的文件路径
             paths = parse_dnd_file_paths(file_paths)
             
-            # 过滤有效的图片文件
-            valid_paths = [p for p in paths if self.is_valid_image(p)]
+            # 过滤有效的图片文件（去掉重复投递的路径，每个路径只检查一次）
+            valid_paths = [p for p in dict.fromkeys(paths) if self.is_valid_image(p)]
             
             # 处理拖放的文件
             if len(valid_paths) == 1:
@@ -2238,29 +3095,57 @@ class OCRApp:
             messagebox.showerror("错误", f"处理拖放文件时出错: {e}")
     
     def is_valid_image(self, file_path):
-        """检查是否是有效的图片文件"""
-        valid_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.gif']
-        _, ext = os.path.splitext(file_path.lower())
-        return os.path.isfile(file_path) and ext in valid_extensions
+        """检查是否是有效的图片文件（先查扩展名，符合的才stat）"""
+        return os.path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS and os.path.isfile(file_path)
     
     def process_dropped_image(self, image_path):
-        """处理拖放的单个图片"""
+        """处理拖放的单个图片（复制在后台线程进行，大图也不会卡住界面）"""
+        self.status_label.config(text="正在复制图片...")
+        
+        def worker():
+            try:
+                # 复制到files文件夹
+                copied_path = self.copy_file_to_files(image_path)
+            except Exception as e:
+                error = str(e)
+                self.root.after(0, lambda: messagebox.showerror("错误", f"处理拖放图片时出错: {error}"))
+                return
+            self.root.after(0, lambda: self._on_dropped_image_copied(copied_path))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_dropped_image_copied(self, copied_path):
+        """拖放图片复制完成后（主线程）显示预览并识别"""
         try:
-            # 复制到files文件夹
-            copied_path = self.copy_file_to_files(image_path)
-            
             # 显示预览
             self.display_image(copied_path)
             
             # 执行OCR
             self.status_label.config(text="正在识别...")
-            self.ocr_manager.DoOCRTask(copied_path)
+            self._dispatch_ocr(copied_path)
             
         except Exception as e:
             messagebox.showerror("错误", f"处理拖放图片时出错: {str(e)}")
     
     def handle_multiple_dropped_images(self, image_paths):
         """处理拖放的多个图片"""
+        # 去掉重复拖入的同一文件（按真实路径、大小、修改时间判断）
+        seen = set()
+        unique_paths = []
+        for path in image_paths:
+            try:
+                st = os.stat(path)
+                key = (os.path.realpath(path), st.st_size, int(st.st_mtime))
+            except OSError:
+                key = (os.path.realpath(path), None, None)
+            if key not in seen:
+                seen.add(key)
+                unique_paths.append(path)
+        image_paths = unique_paths
+        if len(image_paths) == 1:
+            self.process_dropped_image(image_paths[0])
+            return
+        
         options = ["单个处理", "批量处理", "取消"]
         
         choice = messagebox.askquestion(
@@ -2278,13 +3163,15 @@ class OCRApp:
             
             # 将图片添加到批量窗口
             if hasattr(self, 'batch_window') and self.batch_window:
-                for path in image_paths:
-                    self.batch_window.add_single_file(path)
+                self.batch_window.add_paths(image_paths)
         # CANCEL时不做任何处理
 
 
 class BatchOCRWindow:
     """批量OCR窗口"""
+    # 预览图缓存的最大数量
+    MAX_PREVIEWS = 128
+    
     def __init__(self, parent):
         self.parent = parent
         self.ocr_manager = parent.ocr_manager
@@ -2315,8 +3202,16 @@ class BatchOCRWindow:
         self.window.bind("<Unmap>", self.on_window_minimize)
         self.window.bind("<Map>", self.on_window_restore)
         
-        # 文件列表
+        # 文件列表，以及已添加路径的集合（用于去重）
         self.file_list = []
+        self._file_path_set = set()
+        # Treeview行ID -> 文件信息（文件信息中也记录了item_id）
+        self._item_to_file = {}
+        # 内容指纹 -> 该指纹下已添加文件的[路径, 完整内容哈希]（哈希在指纹相同时才计算），
+        # 不同文件夹中的相同图片只处理一次
+        self._qhash_files = {}
+        # 已处理完成的文件数，状态变为“处理完成”时累加，刷新进度时不必遍历列表
+        self._completed_count = 0
         
         # 结果字典
         self.results = {}
@@ -2324,12 +3219,26 @@ class BatchOCRWindow:
         # 任务队列
         self.task_queue = []
         
-        # 当前正在处理的任务
-        self.current_task = None
+        # 正在识别的任务（复制后的图片路径 -> 文件信息），最多同时OCR_CONCURRENCY个
+        self.in_flight = {}
+        self.max_in_flight = OCR_CONCURRENCY
         
         # after调度ID（用于关闭时取消）
         self._after_id = None
         
+        # 后台扫描文件夹的结果队列，关闭窗口时通知扫描线程停止
+        self._scan_queue = None
+        self._scan_added = 0
+        self._scan_stop = threading.Event()
+        
+        # 合并刷新的界面更新：行ID -> 列值，以及最新完成的文件
+        self._pending_updates = {}
+        self._latest_done = None
+        self._ui_after_id = None
+        
+        # 预览图缓存：(路径, 修改时间) -> PhotoImage，最近使用的排在最后
+        self._preview_cache = collections.OrderedDict()
+        
         # 设置UI
         self.setup_ui()
         self.center_window()
@@ -2488,44 +3397,48 @@ class BatchOCRWindow:
         )
         self.close_btn.pack(side=RIGHT)
         
+        # 状态栏（添加文件等提示不再弹出对话框）
+        self.status_var = tk.StringVar()
+        self._status_after_id = None
+        ttk.Label(bottom_frame, textvariable=self.status_var, anchor=W).pack(side=LEFT, fill=X, expand=True, padx=10)
+        
     def preview_selected_image(self, event=None):
         """预览选中的图片"""
         selection = self.file_tree.selection()
         if selection:
-            item_id = selection[0]
-            item_index = self.file_tree.index(item_id)
-            
-            if item_index < len(self.file_list):
-                file_info = self.file_list[item_index]
-                self.display_preview_image(file_info['path'])
+            file_info = self._item_to_file.get(selection[0])
+            if file_info is not None:
+                self.display_preview_image(file_info['path'], file_info.get('thumb_path'))
     
-    def display_preview_image(self, image_path):
-        """显示预览图片"""
+    def display_preview_image(self, image_path, thumb_path=None):
+        """显示预览图片，有预生成的缩略图时优先读取缩略图"""
         try:
-            # 打开图片
-            image = Image.open(image_path)
-            
-            # 计算缩放比例，保持宽高比
+            # 预览尺寸，保持宽高比
             max_width = 300
             max_height = 200
             
-            # 获取原始尺寸
-            orig_width, orig_height = image.size
-            
-            # 计算缩放比例
-            width_ratio = max_width / orig_width
-            height_ratio = max_height / orig_height
-            scale_ratio = min(width_ratio, height_ratio, 1.0)  # 不放大
-            
-            # 计算新尺寸
-            new_width = int(orig_width * scale_ratio)
-            new_height = int(orig_height * scale_ratio)
-            
-            # 缩放图片
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # 重复点击同一文件时直接复用缓存的PhotoImage
+            key = (image_path, os.path.getmtime(image_path), max_width, max_height)
+            photo = self._preview_cache.get(key)
+            if photo is not None:
+                self._preview_cache.move_to_end(key)
+                self.preview_label.configure(image=photo, text="")
+                self.preview_label.image = photo
+                self.current_preview_path = image_path
+                return
             
-            # 转换为PhotoImage
-            photo = ImageTk.PhotoImage(image)
+            # 打开图片
+            with Image.open(thumb_path if thumb_path and os.path.exists(thumb_path) else image_path) as image:
+                # JPEG在解码时直接降采样；thumbnail原地缩放且不会放大
+                # （预览尺寸很小，BILINEAR与LANCZOS看不出差别但快得多）
+                image.draft('RGB', (max_width * 2, max_height * 2))
+                image.thumbnail((max_width, max_height), Image.Resampling.BILINEAR)
+                
+                # 转换为PhotoImage
+                photo = ImageTk.PhotoImage(image)
+            self._preview_cache[key] = photo
+            if len(self._preview_cache) > self.MAX_PREVIEWS:
+                self._preview_cache.popitem(last=False)
             
             # 更新标签
             self.preview_label.configure(image=photo, text="")
@@ -2559,6 +3472,17 @@ class BatchOCRWindow:
         y = (self.window.winfo_screenheight() // 2) - (height // 2)
         self.window.geometry(f'{width}x{height}+{x}+{y}')
     
+    def _set_status(self, text):
+        """在状态栏显示提示，3秒后自动清除"""
+        self.status_var.set(text)
+        if self._status_after_id is not None:
+            self.window.after_cancel(self._status_after_id)
+        self._status_after_id = self.window.after(3000, self._clear_status)
+    
+    def _clear_status(self):
+        self._status_after_id = None
+        self.status_var.set("")
+    
     def add_files(self):
         """添加文件"""
         file_paths = filedialog.askopenfilenames(
@@ -2570,48 +3494,86 @@ class BatchOCRWindow:
         )
         
         if file_paths:
-            added_count = 0
-            for path in file_paths:
-                if self.add_single_file(path):
-                    added_count += 1
+            added_count = self.add_paths(file_paths)
             
             # 提示添加结果
             if added_count > 0:
-                messagebox.showinfo("添加完成", f"已添加{added_count}个图片文件")
+                self._set_status(f"已添加{added_count}个图片文件")
             else:
-                messagebox.showinfo("提示", "未添加任何新文件（可能已存在）")
+                self._set_status("未添加任何新文件（可能已存在）")
     
     def add_folder(self):
         """添加文件夹中的所有图片"""
         folder_path = filedialog.askdirectory(title="选择包含图片的文件夹")
         
         if folder_path:
-            # 支持的图片格式
-            img_extensions = ('.png', '.jpg', '.jpeg', '.bmp', '.gif')
-            
-            # 遍历文件夹
-            added_count = 0
-            for root, dirs, files in os.walk(folder_path):
-                for file in files:
-                    if file.lower().endswith(img_extensions):
-                        full_path = os.path.join(root, file)
-                        if self.add_single_file(full_path):
-                            added_count += 1
-            
-            # 提示添加结果
-            if added_count > 0:
-                messagebox.showinfo("添加完成", f"已从文件夹添加{added_count}个图片文件")
-            else:
-                messagebox.showinfo("提示", "未添加任何新文件（可能已存在或文件夹中无图片）")
+            # 在后台线程遍历文件夹，界面分批接收结果，大目录也不会卡住
+            self.add_folder_btn.config(state=DISABLED)
+            self._scan_queue = queue.Queue()
+            self._scan_added = 0
+            threading.Thread(target=self._scan_folder, args=(folder_path, self._scan_queue), daemon=True).start()
+            self.window.after(50, self._drain_scan_queue)
+    
+    def _scan_folder(self, folder_path, out):
+        """（后台线程）遍历文件夹，每100个图片一批把(路径列表, 内容指纹列表)放入队列，结束时放入None"""
+        batch = []
+        hashes = []
+        try:
+            for path in iter_images(folder_path):
+                if self._scan_stop.is_set():
+                    break
+                # 内容指纹也在后台算好，界面线程只做集合查找
+                batch.append(path)
+                hashes.append(quick_hash(path))
+                if len(batch) >= 100:
+                    out.put((batch, hashes))
+                    batch = []
+                    hashes = []
+        finally:
+            if batch:
+                out.put((batch, hashes))
+            out.put(None)
+    
+    def _drain_scan_queue(self):
+        """把后台扫描到的路径分批加入列表，扫描结束后提示结果"""
+        if not self.window.winfo_exists():
+            return
+        finished = False
+        try:
+            while True:
+                batch = self._scan_queue.get_nowait()
+                if batch is None:
+                    finished = True
+                    break
+                self._scan_added += self.add_paths(*batch)
+        except queue.Empty:
+            pass
+        if not finished:
+            self.window.after(50, self._drain_scan_queue)
+            return
+        
+        # 批量处理进行中时按钮由on_batch_complete恢复
+        if not (self.in_flight or self.task_queue):
+            self.add_folder_btn.config(state=NORMAL)
+        
+        # 提示添加结果
+        if self._scan_added > 0:
+            self._set_status(f"已从文件夹添加{self._scan_added}个图片文件")
+        else:
+            self._set_status("未添加任何新文件（可能已存在或文件夹中无图片）")
     
     def clear_files(self):
         """清空文件列表"""
         if messagebox.askyesno("确认", "确定要清空文件列表吗？"):
             self.file_list.clear()
+            self._file_path_set.clear()
+            self._item_to_file.clear()
+            self._qhash_files.clear()
+            self._completed_count = 0
+            self._preview_cache.clear()
             
             # 清空Treeview
-            for item in self.file_tree.get_children():
-                self.file_tree.delete(item)
+            self.file_tree.delete(*self.file_tree.get_children())
             
             # 重置进度
             self.total_progress['value'] = 0
@@ -2641,15 +3603,14 @@ class BatchOCRWindow:
         # 重置任务队列
         self.task_queue = [f for f in self.file_list if f['status'] != '处理完成']
         
-        # 更新UI状态
-        for i, file_info in enumerate(self.file_list):
-            if file_info['status'] != '处理完成':
-                file_info['status'] = '等待处理'
-                file_info['progress'] = '0%'
-                
-                # 更新Treeview
-                item_id = self.file_tree.get_children()[i]
-                self.file_tree.item(item_id, values=(file_info['name'], file_info['status'], file_info['progress']))
+        # 更新UI状态，只重绘状态确实变化的行（新添加的文件本来就是“等待处理/0%”）
+        tree_item = self.file_tree.item
+        for file_info in self.task_queue:
+            if file_info['status'] == '等待处理' and file_info['progress'] == '0%':
+                continue
+            file_info['status'] = '等待处理'
+            file_info['progress'] = '0%'
+            tree_item(file_info['item_id'], values=(file_info['name'], '等待处理', '0%'))
         
         # 重置总进度
         self.total_progress['value'] = 0
@@ -2658,37 +3619,144 @@ class BatchOCRWindow:
         percent = 0 if total == 0 else int(completed / total * 100)
         self.progress_label.config(text=f"{completed}/{total} ({percent}%)")
         
+        # 后台为待处理文件生成预览缩略图，之后点选文件时只需读取小图
+        threading.Thread(target=self._make_thumbs, args=(list(self.task_queue),), daemon=True).start()
+        
         # 开始处理第一个文件
         self.process_next_file()
     
+    def _make_thumbs(self, file_infos):
+        """（后台线程）生成300x200缩略图到files/.thumbs，路径记录在file_info['thumb_path']"""
+        try:
+            os.makedirs(THUMBS_DIR, exist_ok=True)
+        except OSError as e:
+            print(f"创建缩略图目录失败: {e}")
+            return
+        for file_info in file_infos:
+            path = file_info['path']
+            try:
+                # 缩略图名由路径和修改时间生成，原图变化后自动重新生成
+                key = f"{os.path.abspath(path)}|{os.path.getmtime(path)}"
+                thumb_path = os.path.join(THUMBS_DIR, hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest() + ".png")
+                if not os.path.exists(thumb_path):
+                    with Image.open(path) as image:
+                        image.draft('RGB', (600, 400))
+                        if image.mode not in PNG_NATIVE_MODES:
+                            image = image.convert('RGB')
+                        image.thumbnail((300, 200), Image.Resampling.BILINEAR)
+                        image.save(thumb_path, 'PNG', compress_level=1)
+                file_info['thumb_path'] = thumb_path
+            except Exception as e:
+                print(f"生成缩略图失败: {path}, 错误: {e}")
+    
     def process_next_file(self):
-        """处理下一个文件"""
-        if not self.task_queue:
+        """在并发上限内派发后续文件，全部完成后结束批处理"""
+        if not self.task_queue and not self.in_flight:
             # 所有任务处理完成
             self.on_batch_complete()
             return
         
-        # 获取下一个文件
-        file_info = self.task_queue.pop(0)
-        self.current_task = file_info
-        
-        # 更新状态
-        file_info['status'] = '处理中'
-        
-        # 更新Treeview
-        index = self.file_list.index(file_info)
-        item_id = self.file_tree.get_children()[index]
-        self.file_tree.item(item_id, values=(file_info['name'], file_info['status'], file_info['progress']))
+        # 循环中反复用到的属性先取到局部变量
+        task_queue = self.task_queue
+        in_flight = self.in_flight
+        parent = self.parent
+        queue_row_update = self._queue_row_update
+        
+        # DoOCRTask本身是异步的，这里只需保持若干个任务在途
+        while task_queue and len(in_flight) < self.max_in_flight:
+            # 获取下一个文件
+            file_info = task_queue.pop(0)
+            
+            if file_info.get('prefetching') and 'copied_path' not in file_info:
+                # 预取线程正在复制这个文件，稍后再派发
+                task_queue.insert(0, file_info)
+                self.window.after(20, self._schedule_next)
+                break
+            
+            # 添加时只检查了扩展名，送识别前再校验文件内容，损坏或改了扩展名的文件不占用识别任务
+            if not image_is_readable(file_info['path']):
+                file_info['status'] = '无效图片'
+                queue_row_update(file_info)
+                self._discard_prefetched(file_info)
+                continue
+            
+            # 更新状态
+            file_info['status'] = '处理中'
+            
+            # 更新Treeview（合并到下次界面刷新）
+            queue_row_update(file_info)
+            
+            # 复制到工作目录（预取过的直接使用）；在途任务按绝对路径登记，与OCR回调的路径一致
+            copied_path = os.path.abspath(file_info.pop('copied_path', None) or parent.copy_file_to_files(file_info['path']))
+            file_info.pop('prefetching', None)
+            if copied_path in in_flight:
+                # 复制失败且原图正在识别中，等它完成后再派发
+                task_queue.insert(0, file_info)
+                break
+            
+            # 设置回调标记
+            parent.is_batch_ocr = True
+            in_flight[copied_path] = file_info
+            
+            # 执行OCR
+            parent._dispatch_ocr(copied_path, on_failed=self.on_file_failed)
         
-        # 复制到工作目录
-        copied_path = self.parent.copy_file_to_files(file_info['path'])
+        # 剩下的文件都是无效图片时循环会直接取空队列，没有在途任务就不会再有回调，需在这里结束批处理
+        if not task_queue and not in_flight:
+            self.on_batch_complete()
+            return
         
-        # 设置回调标记
-        self.parent.is_batch_ocr = True
-        self.parent.current_batch_file = file_info
+        # 识别进行时提前复制接下来的几个文件
+        self._prefetch()
+    
+    def _prefetch(self, count=3):
+        """在后台线程预读并复制队列前面的文件，识别时不必等待磁盘"""
+        upcoming = [f for f in self.task_queue[:count] if not f.get('prefetching')]
+        if not upcoming:
+            return
+        for file_info in upcoming:
+            file_info['prefetching'] = True
+        copy_file = self.parent.copy_file_to_files
+        
+        def worker():
+            for file_info in upcoming:
+                # 顺便完成文件校验，派发时直接命中缓存；无效图片不复制（记为None，派发时会被跳过）
+                if not image_is_readable(file_info['path']):
+                    file_info['copied_path'] = None
+                    continue
+                try:
+                    # 读一遍原图让系统缓存它，硬链接后识别时直接从缓存读取
+                    with open(file_info['path'], 'rb') as f:
+                        while f.read(1 << 20):
+                            pass
+                except OSError:
+                    pass
+                file_info['copied_path'] = copy_file(file_info['path'])
+                if self._scan_stop.is_set():
+                    # 复制期间窗口已关闭，这个副本不会再被识别
+                    self._discard_prefetched(file_info)
         
-        # 执行OCR
-        self.parent.ocr_manager.DoOCRTask(copied_path)
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _discard_prefetched(self, file_info):
+        """删除预取后没有派发的副本，避免files目录中留下没有历史记录的图片（可在后台线程调用）"""
+        copied_path = file_info.pop('copied_path', None)
+        file_info.pop('prefetching', None)
+        # 复制失败时copy_file_to_files返回的是原图路径，不能删除
+        if copied_path and os.path.abspath(copied_path) != os.path.abspath(file_info['path']):
+            try:
+                os.remove(copied_path)
+            except OSError as e:
+                print(f"删除预取副本失败: {copied_path}, 错误: {e}")
+    
+    def on_file_failed(self, image_path):
+        """文件提交OCR多次失败后的处理"""
+        file_info = self.in_flight.pop(os.path.abspath(image_path), None)
+        if file_info is None or not self.window.winfo_exists():
+            return
+        file_info['status'] = '处理失败'
+        self._queue_row_update(file_info)
+        self._schedule_next()
     
     def on_file_processed(self, file_info, ocr_result, image_path):
         """文件处理完成的回调"""
@@ -2699,45 +3767,16 @@ class BatchOCRWindow:
             
         try:
             # 更新文件状态
+            if file_info['status'] != '处理完成':
+                self._completed_count += 1
             file_info['status'] = '处理完成'
             file_info['progress'] = '100%'
             file_info['result'] = ocr_result
             file_info['image_path'] = image_path
             
-            # 更新Treeview
-            index = self.file_list.index(file_info)
-            # 检查Treeview是否仍然存在
-            if hasattr(self, 'file_tree') and self.file_tree.winfo_exists():
-                children = self.file_tree.get_children()
-                if index < len(children):
-                    item_id = children[index]
-                    self.file_tree.item(item_id, values=(file_info['name'], file_info['status'], file_info['progress']))
-                    
-                    # 选中当前处理的项
-                    self.file_tree.selection_set(item_id)
-                    self.file_tree.see(item_id)
-            
-            # 更新总进度
-            completed = sum(1 for f in self.file_list if f['status'] == '处理完成')
-            total = len(self.file_list)
-            percent = int(completed / total * 100)
-            
-            # 检查进度条是否仍然存在
-            if hasattr(self, 'total_progress') and self.total_progress.winfo_exists():
-                self.total_progress['value'] = percent
-                
-            # 检查标签是否仍然存在
-            if hasattr(self, 'progress_label') and self.progress_label.winfo_exists():
-                self.progress_label.config(text=f"{completed}/{total} ({percent}%)")
-            
-            # 显示结果预览
-            if hasattr(self, 'result_text') and self.result_text.winfo_exists():
-                self.result_text.delete(1.0, tk.END)
-                self.result_text.insert(1.0, ocr_result)
-            
-            # 显示图片预览
-            if hasattr(self, 'preview_label') and self.preview_label.winfo_exists():
-                self.display_preview_image(file_info['path'])
+            # 界面更新合并到下次刷新，只显示最新完成的文件
+            self._latest_done = file_info
+            self._queue_row_update(file_info)
             
             # 保存到历史记录
             history_item = {
@@ -2746,33 +3785,78 @@ class BatchOCRWindow:
                 'text': ocr_result,
                 'raw_result': {'type': 'batch_ocr', 'original_path': file_info['path']}
             }
-            self.parent.history.append(history_item)
-            self.parent.save_history()
+            self.parent._append_history(history_item)
             
-            # 处理下一个文件（使用受控after）
-            self.current_task = None
-            if self.window.winfo_exists():
-                if self._after_id:
-                    try:
-                        self.window.after_cancel(self._after_id)
-                    except:
-                        pass
-                self._after_id = self.window.after(200, self.process_next_file)
+            # 处理下一个文件
+            self._schedule_next()
                 
         except Exception as e:
             print(f"批量OCR处理文件时发生错误: {e}")
             # 尝试继续处理下一个文件
-            self.current_task = None
-            if self.window.winfo_exists():
-                if self._after_id:
-                    try:
-                        self.window.after_cancel(self._after_id)
-                    except:
-                        pass
-                self._after_id = self.window.after(200, self.process_next_file)
+            self._schedule_next()
+    
+    def _queue_row_update(self, file_info):
+        """记下待刷新的行，50ms内的多次更新合并为一次界面刷新（不超过20次/秒）"""
+        self._pending_updates[file_info['item_id']] = (file_info['name'], file_info['status'], file_info['progress'])
+        if self._ui_after_id is None:
+            self._ui_after_id = self.window.after(50, self._flush_ui_updates)
+    
+    def _flush_ui_updates(self):
+        """一次性应用所有待刷新的行、总进度和最新完成文件的预览"""
+        self._ui_after_id = None
+        pending, self._pending_updates = self._pending_updates, {}
+        latest, self._latest_done = self._latest_done, None
+        
+        # 子组件都在setup_ui中创建，窗口存在时它们一定存在，只需检查一次窗口
+        if not self.window.winfo_exists():
+            return
+        
+        tree = self.file_tree
+        try:
+            # 更新Treeview
+            tree_item = tree.item
+            for item_id, values in pending.items():
+                tree_item(item_id, values=values)
+            
+            # 只选中最新完成的项
+            if latest is not None:
+                tree.selection_set(latest['item_id'])
+                tree.see(latest['item_id'])
+            
+            # 更新总进度
+            completed = self._completed_count
+            total = len(self.file_list)
+            percent = int(completed / total * 100) if total else 0
+            self.total_progress['value'] = percent
+            self.progress_label.config(text=f"{completed}/{total} ({percent}%)")
+            
+            if latest is not None:
+                # 显示结果预览
+                self.result_text.replace(1.0, tk.END, latest['result'])
+                
+                # 显示图片预览
+                self.display_preview_image(latest['path'], latest.get('thumb_path'))
+        except tk.TclError as e:
+            # 关闭窗口的瞬间组件可能正在销毁
+            print(f"刷新批量OCR界面失败: {e}")
+    
+    def _schedule_next(self):
+        """空闲时立即补充派发任务（同一轮事件中的多个完成回调只派发一次）"""
+        # 已经安排过就直接返回，不必每次取消再重新注册
+        if self._after_id is None and self.window.winfo_exists():
+            self._after_id = self.window.after_idle(self._run_scheduled)
+    
+    def _run_scheduled(self):
+        self._after_id = None
+        self.process_next_file()
     
     def on_batch_complete(self):
         """批量处理完成"""
+        # 先把尚未刷新的界面更新应用完
+        if self._ui_after_id is not None:
+            self.window.after_cancel(self._ui_after_id)
+            self._flush_ui_updates()
+        
         # 启用按钮
         self.add_files_btn.config(state=NORMAL)
         self.add_folder_btn.config(state=NORMAL)
@@ -2780,17 +3864,14 @@ class BatchOCRWindow:
         self.start_btn.config(state=NORMAL)
         self.export_btn.config(state=NORMAL)
         
-        # 清理父应用批量状态
+        # 清理父应用批量状态，并立即写入本批的历史记录
         if self.parent:
             self.parent.is_batch_ocr = False
-            self.parent.current_batch_file = None
+            self.parent._flush_history()
         
         # 取消pending after
-        if self._after_id:
-            try:
-                self.window.after_cancel(self._after_id)
-            except:
-                pass
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
             self._after_id = None
         
         # 显示完成消息
@@ -2800,12 +3881,8 @@ class BatchOCRWindow:
         """双击查看结果"""
         selection = self.file_tree.selection()
         if selection:
-            item_id = selection[0]
-            item_index = self.file_tree.index(item_id)
-            
-            if item_index < len(self.file_list):
-                file_info = self.file_list[item_index]
-                
+            file_info = self._item_to_file.get(selection[0])
+            if file_info is not None:
                 if file_info['result']:
                     # 显示结果
                     self.result_text.delete(1.0, tk.END)
@@ -2833,23 +3910,23 @@ class BatchOCRWindow:
         
         if save_path:
             try:
-                with open(save_path, 'w', encoding='utf-8') as f:
-                    if save_path.endswith('.csv'):
-                        # CSV格式导出
-                        import csv
-                        writer = csv.writer(f)
+                # 使用1MB缓冲，减少大批量导出时的写入次数；csv模块要求newline=''
+                is_csv = save_path.endswith('.csv')
+                with open(save_path, 'w', encoding='utf-8', newline='' if is_csv else None, buffering=1 << 20) as f:
+                    if is_csv:
+                        # CSV格式导出，字段全部加引号，识别结果中的换行原样保留
+                        writer = csv.writer(f, quoting=csv.QUOTE_ALL)
                         writer.writerow(['文件名', 'OCR结果'])
-                        
-                        for file_info in self.file_list:
-                            if file_info['result']:
-                                writer.writerow([file_info['name'], file_info['result'].replace('\n', ' ')])
+                        writer.writerows(
+                            (file_info['name'], file_info['result'])
+                            for file_info in self.file_list if file_info['result']
+                        )
                     else:
                         # 文本格式导出
-                        for file_info in self.file_list:
-                            if file_info['result']:
-                                f.write(f"===== {file_info['name']} =====\n")
-                                f.write(file_info['result'])
-                                f.write("\n\n")
+                        f.write(''.join(
+                            f"===== {file_info['name']} =====\n{file_info['result']}\n\n"
+                            for file_info in self.file_list if file_info['result']
+                        ))
                 
                 messagebox.showinfo("成功", f"结果已导出到 {save_path}")
             except Exception as e:
@@ -2859,7 +3936,7 @@ class BatchOCRWindow:
         """关闭窗口"""
         try:
             # 如果还有任务在处理中，询问是否确认关闭
-            if self.current_task or self.task_queue:
+            if self.in_flight or self.task_queue:
                 if not messagebox.askyesno("确认", "还有任务正在处理，确定要关闭吗？"):
                     return
                 
@@ -2875,24 +3952,29 @@ class BatchOCRWindow:
             
             # 重置父应用状态（直接调用，不等待窗口销毁后）
             if parent:
+                parent._flush_history()
                 parent.reset_app_state()
                 parent.is_batch_ocr = False
-                parent.current_batch_file = None
                 parent.batch_window = None
             
             # 取消pending after
-            if self._after_id:
-                try:
-                    self.window.after_cancel(self._after_id)
-                except:
-                    pass
+            if self._after_id is not None:
+                self.window.after_cancel(self._after_id)
                 self._after_id = None
+            if self._ui_after_id is not None:
+                self.window.after_cancel(self._ui_after_id)
+                self._ui_after_id = None
+            
+            # 停止后台文件夹扫描和预取，删除已预取但未派发的副本
+            self._scan_stop.set()
+            for file_info in self.task_queue:
+                self._discard_prefetched(file_info)
             
             # 清除对象引用，防止循环引用
             self.parent = None
             self.ocr_manager = None
             self.task_queue = []
-            self.current_task = None
+            self.in_flight = {}
             
             # 先销毁窗口
             if hasattr(self, 'window') and self.window.winfo_exists():
@@ -2934,7 +4016,7 @@ class BatchOCRWindow:
     def update_progress_display(self):
         """更新进度显示"""
         # 更新总进度
-        completed = sum(1 for f in self.file_list if f['status'] == '处理完成')
+        completed = self._completed_count
         total = len(self.file_list)
         percent = 0 if total == 0 else int(completed / total * 100)
         
@@ -2945,36 +4027,80 @@ class BatchOCRWindow:
         if completed > 0:
             self.export_btn.config(state=NORMAL)
 
-    def add_single_file(self, path):
-        """添加单个文件到列表"""
+    def add_single_file(self, path, refresh=True, qhash=None):
+        """添加单个文件到列表；批量添加时传refresh=False，由add_paths最后统一刷新。
+        qhash为预先算好的quick_hash结果，未提供时在这里计算"""
         # 检查是否已添加
-        if path not in [f['path'] for f in self.file_list]:
-            file_info = {
-                'path': path,
-                'name': os.path.basename(path),
-                'status': '等待处理',
-                'progress': '0%',
-                'result': None
-            }
-            self.file_list.append(file_info)
-            
-            # 添加到Treeview
-            self.file_tree.insert('', 'end', values=(file_info['name'], file_info['status'], file_info['progress']))
-            
-            # 更新UI
-            self.update_progress_display()
-            
-            # 选择并预览新添加的项
-            last_item = self.file_tree.get_children()[-1]
-            self.file_tree.selection_set(last_item)
-            self.file_tree.focus(last_item)
-            self.file_tree.see(last_item)
-            
-            # 显示预览
-            self.display_preview_image(path)
-            
-            return True
-        return False
+        if path in self._file_path_set:
+            return False
+        # 内容相同的图片（如复制到其他文件夹的同一张图）不重复加入
+        if qhash is None:
+            qhash = quick_hash(path)
+        same_qhash = self._qhash_files.get(qhash) if qhash is not None else None
+        digest = None
+        if same_qhash:
+            # 指纹只采样了首尾，相同时再比较完整内容，只差中间部分的不同图片不会被误判为重复
+            digest = self._content_digest(path)
+            if digest is not None and any(self._entry_digest(entry) == digest for entry in same_qhash):
+                return False
+        if qhash is not None:
+            self._qhash_files.setdefault(qhash, []).append([path, digest])
+        file_info = {
+            'path': path,
+            'name': os.path.basename(path),
+            'status': '等待处理',
+            'progress': '0%',
+            'result': None
+        }
+        # 添加到Treeview，记下行ID，之后更新无需查找
+        item_id = self.file_tree.insert('', 'end', values=(file_info['name'], file_info['status'], file_info['progress']))
+        file_info['item_id'] = item_id
+        self._item_to_file[item_id] = file_info
+        self.file_list.append(file_info)
+        self._file_path_set.add(path)
+        
+        if refresh:
+            self._refresh_after_add()
+        return True
+    
+    @staticmethod
+    def _content_digest(path):
+        """完整内容哈希，读取失败时返回None"""
+        try:
+            return OCRCache.digest(path)
+        except OSError:
+            return None
+    
+    def _entry_digest(self, entry):
+        """取_qhash_files条目的完整内容哈希，第一次用到时才计算"""
+        if entry[1] is None:
+            entry[1] = self._content_digest(entry[0])
+        return entry[1]
+    
+    def add_paths(self, paths, qhashes=None):
+        """批量添加文件，全部插入后只刷新一次进度和预览，返回新增数量"""
+        if qhashes is None:
+            qhashes = [None] * len(paths)
+        added_count = 0
+        for path, qhash in zip(paths, qhashes):
+            if self.add_single_file(path, refresh=False, qhash=qhash):
+                added_count += 1
+        if added_count:
+            self._refresh_after_add()
+        return added_count
+    
+    def _refresh_after_add(self):
+        """更新进度，并选中、预览最后添加的文件"""
+        # 更新UI
+        self.update_progress_display()
+        
+        # 选择并预览新添加的项
+        # 选中新行会触发<<TreeviewSelect>>，由preview_selected_image在事件循环空闲时解码预览，
+        # 添加文件的调用本身不再等待图片解码
+        last_item = self.file_list[-1]['item_id']
+        self.file_tree.selection_set(last_item)
+        self.file_tree.focus(last_item)
+        self.file_tree.see(last_item)
 
     def setup_drag_drop(self):
         """设置拖放功能"""
@@ -3009,23 +4135,20 @@ class BatchOCRWindow:
             # 解析拖放的文件路径
             paths = parse_dnd_file_paths(file_paths)
             
-            # 过滤有效的图片文件
-            valid_paths = [p for p in paths if self.is_valid_image(p)]
+            # 过滤有效的图片文件（去掉重复投递的路径，每个路径只检查一次）
+            valid_paths = [p for p in dict.fromkeys(paths) if self.is_valid_image(p)]
             
             # 添加到列表
             if valid_paths:
-                added_count = 0
-                for path in valid_paths:
-                    if self.add_single_file(path):
-                        added_count += 1
+                added_count = self.add_paths(valid_paths)
                 
                 if added_count > 0:
-                    messagebox.showinfo("成功", f"已添加{added_count}个图片文件")
+                    self._set_status(f"已添加{added_count}个图片文件")
                     print(f"成功添加{added_count}个图片文件")
                 else:
-                    messagebox.showinfo("提示", "未添加任何新文件（可能已存在）")
+                    self._set_status("未添加任何新文件（可能已存在）")
             else:
-                messagebox.showwarning("警告", "未找到有效的图片文件")
+                self._set_status("未找到有效的图片文件")
                 print("未找到有效的图片文件")
         except Exception as e:
             print(f"处理拖放文件时出错: {e}")
@@ -3033,18 +4156,11 @@ class BatchOCRWindow:
 
     def is_valid_image(self, file_path):
         """检查是否是有效的图片文件"""
-        valid_extensions = ['.png', '.jpg', '.jpeg', '.bmp', '.gif']
-        try:
-            # 确保路径有效
-            if not file_path or not os.path.exists(file_path):
-                return False
-            
-            # 检查文件扩展名
-            _, ext = os.path.splitext(file_path.lower())
-            return os.path.isfile(file_path) and ext in valid_extensions
-        except Exception as e:
-            print(f"检查图片文件有效性时出错: {e}")
+        if not file_path:
             return False
+        
+        # 先检查扩展名，符合的才访问磁盘；isfile只做一次stat，不存在时返回False
+        return os.path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS and os.path.isfile(file_path)
 
 
 if __name__ == "__main__":
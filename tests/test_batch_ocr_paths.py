@@ -0,0 +1,158 @@
+"""批量OCR按图片路径找回任务的回归测试。
+
+DoOCRTask会先把路径转成绝对路径再提交，回调收到的也是绝对路径；
+这里用假的OcrManager模拟这一行为，不需要启动微信OCR服务和界面。
+ocr_app依赖的wechat_ocr只能在Windows上导入，缺少依赖时跳过。
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    from PIL import Image
+    import ocr_app
+except Exception:  # 缺少运行依赖（wechat_ocr仅支持Windows）
+    ocr_app = None
+
+
+class FakeRoot:
+    """记录after回调，由测试手动执行"""
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func=None, *args):
+        self.callbacks.append((ms, func, args))
+        return f"after#{len(self.callbacks)}"
+
+    def after_idle(self, func, *args):
+        return self.after(0, func, *args)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def winfo_exists(self):
+        return True
+
+    def run_pending(self):
+        """执行所有立即回调（ms=0），模拟Tk主循环处理root.after(0, ...)"""
+        while True:
+            ready = [cb for cb in self.callbacks if cb[0] == 0]
+            if not ready:
+                return
+            for cb in ready:
+                self.callbacks.remove(cb)
+                cb[1](*cb[2])
+
+
+class FakeOcrManager:
+    """与wechat_ocr的OcrManager一样：提交前转成绝对路径，回调时给出绝对路径"""
+    def __init__(self):
+        self.submitted = []
+
+    def DoOCRTask(self, pic_path):
+        if not os.path.exists(pic_path):
+            raise Exception(f"给定图片路径pic_path不存在: {pic_path}")
+        self.submitted.append(os.path.abspath(pic_path))
+
+
+@unittest.skipUnless(ocr_app, "需要ocr_app的运行依赖")
+class BatchCallbackPathTest(unittest.TestCase):
+    def setUp(self):
+        self.old_cwd = os.getcwd()
+        self.tmp = tempfile.mkdtemp()
+        os.chdir(self.tmp)
+        os.makedirs("files")
+        os.makedirs("src")
+        self.image_path = os.path.join("src", "a.png")
+        Image.new('RGB', (40, 20), 'white').save(self.image_path)
+
+        self.root = FakeRoot()
+        self.manager = FakeOcrManager()
+
+        app = ocr_app.OCRApp.__new__(ocr_app.OCRApp)
+        app.root = self.root
+        app.ocr_manager = self.manager
+        app.ocr_cache = ocr_app.OCRCache(os.path.join("files", ".ocr_cache.json"))
+        app._pending_digests = {}
+        app._ocr_aliases = {}
+        app._ocr_outstanding = 0
+        app._cache_save_after_id = None
+        app._date_folder_cache = (None, None)
+        app._copy_lock = threading.Lock()
+        app.is_batch_ocr = False
+        self.app = app
+
+        window = ocr_app.BatchOCRWindow.__new__(ocr_app.BatchOCRWindow)
+        window.parent = app
+        window.window = self.root
+        window.task_queue = []
+        window.in_flight = {}
+        window.max_in_flight = 2
+        window._after_id = None
+        self.processed = []
+        window._queue_row_update = lambda file_info: None
+        window._prefetch = lambda count=3: None
+        window.on_batch_complete = lambda: None
+        window.on_file_processed = lambda file_info, text, path: self.processed.append((file_info, text, path))
+        app.batch_window = window
+        self.window = window
+
+    def tearDown(self):
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_result_with_absolute_path_reaches_batch_file(self):
+        file_info = {'path': self.image_path, 'name': 'a.png', 'status': '等待处理', 'progress': '0%', 'result': None}
+        self.window.task_queue.append(file_info)
+        self.window.process_next_file()
+
+        self.assertEqual(len(self.manager.submitted), 1)
+        submitted = self.manager.submitted[0]
+        self.assertTrue(os.path.isabs(submitted))
+
+        self.app.ocr_result_callback(submitted, {'ocrResult': [{'text': '你好'}]})
+        self.root.run_pending()
+
+        self.assertEqual(len(self.processed), 1)
+        self.assertIs(self.processed[0][0], file_info)
+        self.assertEqual(self.processed[0][1], '你好')
+        self.assertEqual(self.window.in_flight, {})
+        # 结果写入了内容缓存
+        self.assertEqual(self.app._pending_digests, {})
+        self.assertEqual(self.app.ocr_cache.get(ocr_app.OCRCache.digest(submitted)), '你好')
+
+    def test_pending_digest_keyed_by_callback_path(self):
+        # 单张识别传入的是相对路径，回调时按绝对路径取回待写缓存的哈希
+        self.app._dispatch_ocr(self.image_path)
+        self.assertEqual(list(self.app._pending_digests), [self.manager.submitted[0]])
+
+    def test_full_queue_retries_with_prepared_path(self):
+        failed = []
+        self.app._ocr_outstanding = ocr_app.OCR_MAX_TASK_ID
+        self.app._dispatch_ocr(self.image_path, on_failed=failed.append)
+        self.assertEqual(self.manager.submitted, [])
+        ms, retry, args = self.root.callbacks[-1]
+        self.assertEqual(ms, 200)
+
+        # 有任务完成后重试，提交的仍是同一张图片
+        self.app._ocr_outstanding = 0
+        retry(*args)
+        self.assertEqual(self.manager.submitted, [os.path.abspath(self.image_path)])
+        self.assertEqual(self.app._ocr_outstanding, 1)
+        self.assertEqual(failed, [])
+
+    def test_submit_error_fails_without_retry(self):
+        def not_started(pic_path):
+            raise Exception("请先调用StartWeChatOCR启动")
+        self.manager.DoOCRTask = not_started
+        failed = []
+        self.app._dispatch_ocr(self.image_path, on_failed=failed.append)
+        self.assertEqual(failed, [os.path.abspath(self.image_path)])
+        self.assertEqual(self.root.callbacks, [])
+        self.assertEqual(self.app._pending_digests, {})
+
+
+if __name__ == '__main__':
+    unittest.main()